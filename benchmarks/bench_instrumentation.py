@@ -0,0 +1,98 @@
+"""bench_instrumentation.py
+A microbenchmark for the cost of the instrumentation hooks.
+
+This script measures, in nanoseconds per call, a plain method, the same
+method decorated with `@timed` and a bare `recorder.add`, first with the
+recorder disabled (the default for every run without --metrics-json, --trace
+or --openmetrics) and then enabled. The disabled figures minus the plain call
+are the overhead every scaffold pays; the enabled ones show the price of a
+span. Each figure is the best of several repeats.
+
+Ex. Usage:
+python benchmarks/bench_instrumentation.py
+python benchmarks/bench_instrumentation.py --calls 200000 --repeat 7 --output instrumentation.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from src.instrumentation import MAX_SPANS, recorder, timed
+
+
+class Component:
+    def plain(self, value):
+        return value + 1
+
+    @timed('Component')
+    def traced(self, value):
+        return value + 1
+
+
+def best_of(repeat, function, setup=None):
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(calls, repeat):
+    component = Component()
+    loops = range(calls)
+
+    def plain():
+        for value in loops:
+            component.plain(value)
+
+    def traced():
+        for value in loops:
+            component.traced(value)
+
+    def add():
+        for _ in loops:
+            recorder.add('bytes_written', 1)
+
+    # Start every repeat from an empty span list, so that MAX_SPANS is never hit.
+    setup = recorder.enable if recorder.enabled else None
+    return {
+        name: best_of(repeat, function, setup) * 1e9 / calls
+        for name, function in (('plain call', plain), ('@timed call', traced), ('recorder.add', add))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the per-call cost of the instrumentation hooks.")
+    parser.add_argument('--calls', type=int, default=100_000, help="calls per measurement")
+    parser.add_argument('--repeat', type=int, default=5, help="best-of repeats for every figure")
+    parser.add_argument('--output', help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.calls > MAX_SPANS:
+        parser.error(f"--calls must not exceed {MAX_SPANS}, the number of spans kept per run")
+
+    recorder.disable()
+    results = {'disabled': measure(args.calls, args.repeat)}
+    recorder.enable()
+    results['enabled'] = measure(args.calls, args.repeat)
+    recorder.disable()
+
+    print(f"{'':<14} {'disabled ns':>12} {'enabled ns':>11}")
+    for name in results['disabled']:
+        print(f"{name:<14} {results['disabled'][name]:12.1f} {results['enabled'][name]:11.1f}")
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as file:
+            json.dump({'calls': args.calls, 'repeat': args.repeat, 'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
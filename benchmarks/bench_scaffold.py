@@ -0,0 +1,189 @@
+"""bench_scaffold.py
+A benchmark harness for the batch scaffolding pipeline.
+
+This script scaffolds 1, 10 and 100 projects (configurable) into temporary
+directories, serving every .gitignore and license template from a local HTTP
+stand-in so that results do not depend on GitHub. Each run starts from an
+empty template cache, records per-step metrics through the built-in
+instrumentation, and appends a summary keyed by the current git commit to a
+JSON-lines history file. The newest run is compared against the most recent
+run of a different commit, and the script exits non-zero if any size got
+slower than the allowed regression.
+
+Ex. Usage:
+python benchmarks/bench_scaffold.py --sizes 1 10 100 --latency 0.05
+python benchmarks/bench_scaffold.py --max-regression 0.25 --output metrics.json
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from src.batch import BatchScaffolder
+from src.instrumentation import recorder
+from src.template_cache import TemplateCache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, 'benchmarks', 'history.jsonl')
+TEMPLATES = ('Python', 'Node')
+
+
+class TemplateHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves the stand-in template directory, optionally after a fixed delay.
+    """
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+def write_templates(directory):
+    """
+    Creates synthetic .gitignore and license templates of realistic size.
+    """
+    os.makedirs(os.path.join(directory, 'gitignore'))
+    os.makedirs(os.path.join(directory, 'licenses'))
+    for name in TEMPLATES:
+        with open(os.path.join(directory, 'gitignore', f'{name}.gitignore'), mode='w', encoding='utf-8') as file:
+            file.writelines(f'# {name} rule {i}\n{name.lower()}_artifact_{i}/\n*.{name.lower()}{i}\n'
+                            for i in range(100))
+    with open(os.path.join(directory, 'licenses', 'mit.txt'), mode='w', encoding='utf-8') as file:
+        file.write('MIT License\n\n' + 'Permission is hereby granted, free of charge. ' * 40 + '\n')
+
+
+def start_server(directory, latency):
+    handler = functools.partial(type('Handler', (TemplateHandler,), {'latency': latency}), directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def bench_size(size, base_url, config_path, workers):
+    """
+    Scaffolds `size` projects from a cold template cache.
+
+    Returns:
+        dict: Wall time and the instrumentation report for this size.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        manifest_path = os.path.join(work_dir, 'manifest.json')
+        with open(manifest_path, mode='w', encoding='utf-8') as file:
+            json.dump({'names': [f'Benchmark Project {i}' for i in range(size)]}, file)
+        scaffolder = BatchScaffolder(
+            config_path=config_path,
+            output_dir=os.path.join(work_dir, 'projects'),
+            workers=workers,
+            gitignore_templates=TEMPLATES,
+            with_pylintrc=False,
+            cache=TemplateCache(cache_dir=os.path.join(work_dir, 'cache')),
+            gitignore_base_url=f'{base_url}/gitignore',
+            license_base_url=f'{base_url}/licenses',
+            bundle=False,
+        )
+        recorder.enable()
+        start = time.perf_counter()
+        scaffolder.run(manifest_path)
+        seconds = time.perf_counter() - start
+        recorder.disable()
+        return {'seconds': seconds, 'metrics': recorder.report()}
+
+
+def load_history(path):
+    try:
+        with open(path, mode='r', encoding='utf-8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+    except OSError:
+        return []
+
+
+def compare(current, history, max_regression):
+    """
+    Compares the current run with the latest run of another commit.
+
+    Returns:
+        list: Human-readable descriptions of sizes that regressed.
+    """
+    previous = next((run for run in reversed(history) if run['commit'] != current['commit']), None)
+    if previous is None:
+        print("No earlier commit in history to compare against.")
+        return []
+    regressions = []
+    for size, seconds in current['seconds'].items():
+        before = previous['seconds'].get(size)
+        if not before:
+            continue
+        change = seconds / before - 1
+        print(f"{size:>4} projects: {before:.3f}s -> {seconds:.3f}s ({change:+.1%}) vs {previous['commit']}")
+        if change > max_regression:
+            regressions.append(f"{size} projects regressed by {change:.1%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark batch scaffolding against a local template server.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds of delay per template request")
+    parser.add_argument('--config', default=os.path.join(REPO_ROOT, 'config', 'conf.ini'))
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON-lines file of past runs")
+    parser.add_argument('--max-regression', type=float, default=0.2, help="allowed slowdown, e.g. 0.2 for 20%%")
+    parser.add_argument('--output', help="write the full per-step metrics of this run to a JSON file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as template_dir:
+        write_templates(template_dir)
+        server = start_server(template_dir, args.latency)
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            results = {str(size): bench_size(size, base_url, args.config, args.workers) for size in args.sizes}
+        finally:
+            server.shutdown()
+
+    current = {
+        'commit': git_commit(),
+        'timestamp': time.time(),
+        'python': sys.version.split()[0],
+        'seconds': {size: result['seconds'] for size, result in results.items()},
+    }
+    for size, result in results.items():
+        print(f"{size:>4} projects: {result['seconds']:.3f}s")
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as file:
+            json.dump({**current, 'metrics': {size: r['metrics'] for size, r in results.items()}}, file, indent=2)
+
+    history = load_history(args.history)
+    regressions = compare(current, history, args.max_regression)
+    with open(args.history, mode='a', encoding='utf-8') as file:
+        file.write(json.dumps(current, sort_keys=True) + '\n')
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
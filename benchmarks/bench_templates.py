@@ -0,0 +1,150 @@
+"""bench_templates.py
+A microbenchmark for the compiled template engine.
+
+This script measures, for the default README template and sample
+pyproject.toml and LICENSE-header templates, the one-off compile cost and
+the per-render cost in microseconds when a batch of per-project contexts is
+rendered with `Template.render_many`. The README is also rendered with the
+hand-written string building it replaced, as a floor for comparison. Each
+figure is the best of several repeats.
+
+Ex. Usage:
+python benchmarks/bench_templates.py
+python benchmarks/bench_templates.py --contexts 10000 --repeat 7 --output templates.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from src.readme_generator import README_TEMPLATE
+from src.templating import Template
+
+PYPROJECT_TEMPLATE = '''[tool.poetry]
+name = {{ poetry.name|toml }}
+version = {{ poetry.version|toml }}
+description = {{ poetry.description|toml }}
+authors = [{{ poetry.authors|join(", ")|toml }}]
+
+[tool.poetry.dependencies]
+{% for key, value in dependencies|items -%}
+{{ key }} = {{ value|toml }}
+{% endfor -%}
+'''
+LICENSE_TEMPLATE = 'Copyright (c) {{ year }} {{ author }}\n\n{{ license }}'
+
+
+def readme_context(index):
+    return {
+        'title': f'project_{index}',
+        'description': f'Project number {index}, generated for the benchmark.',
+        'dependencies': [f'package{n}>={n}.0' for n in range(8)],
+        'license': 'MIT License\n\n' + 'Permission is hereby granted, free of charge. ' * 20,
+        'has_tests': index % 2 == 0,
+        'has_scripts': True,
+        'has_data': index % 3 == 0,
+        'has_config': True,
+    }
+
+
+def pyproject_context(index):
+    return {
+        'poetry': {
+            'name': f'project_{index}',
+            'version': f'1.{index}.0',
+            'description': 'A "quoted" description\nover two lines',
+            'authors': ['Jane Doe <jane@example.com>'],
+        },
+        'dependencies': {'python': '>=3.8', **{f'package{n}': f'^{n}.0' for n in range(8)}},
+    }
+
+
+def license_context(index):
+    return {'year': 2000 + index % 30, 'author': f'Author {index}', 'license': 'MIT License\n\n' + 'x' * 1000}
+
+
+def handwritten_readme(context):
+    """
+    The README as built before templates, by appending string parts.
+    """
+    parts = [f"# {context['title']}\n\n", f"{context['description']}\n\n"]
+    if context['dependencies']:
+        parts.append('## Dependencies\n\n')
+        parts.append('\n'.join(context['dependencies']) + '\n\n')
+    parts.append('## Project Structure\n\n')
+    if context['has_tests']:
+        parts.append('- `tests/`: Directory containing test files\n')
+    if context['has_scripts']:
+        parts.append('- `scripts/`: Directory containing script files\n')
+    if context['has_data']:
+        parts.append('- `data/`: Directory containing data files\n')
+    if context['has_config']:
+        parts.append('- `config/conf.ini`: Configuration file\n')
+    if context['license']:
+        parts.append('## License\n\n')
+        parts.append(f"```\n{context['license']}\n```")
+    return ''.join(parts)
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure template compile and per-render cost.")
+    parser.add_argument('--contexts', type=int, default=1000, help="per-project contexts rendered per batch")
+    parser.add_argument('--repeat', type=int, default=5, help="best-of repeats for every figure")
+    parser.add_argument('--output', help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    cases = [
+        ('README.md', README_TEMPLATE, readme_context),
+        ('pyproject.toml', PYPROJECT_TEMPLATE, pyproject_context),
+        ('LICENSE', LICENSE_TEMPLATE, license_context),
+    ]
+    results = {}
+    print(f"{'template':<16} {'compile µs':>11} {'render µs':>10} {'batch ms':>9}  ({args.contexts} contexts)")
+    for name, source, make_context in cases:
+        contexts = [make_context(index) for index in range(args.contexts)]
+        compile_seconds = best_of(args.repeat, lambda source=source, name=name: Template(source, name))
+        template = Template(source, name)
+        batch_seconds = best_of(args.repeat, lambda template=template, contexts=contexts:
+                                template.render_many(contexts))
+        results[name] = {
+            'compile_us': compile_seconds * 1e6,
+            'render_us': batch_seconds * 1e6 / args.contexts,
+            'batch_ms': batch_seconds * 1e3,
+        }
+        print(f"{name:<16} {compile_seconds * 1e6:11.1f} {batch_seconds * 1e6 / args.contexts:10.2f} "
+              f"{batch_seconds * 1e3:9.2f}")
+
+    contexts = [readme_context(index) for index in range(args.contexts)]
+    template = Template(README_TEMPLATE, 'README.md')
+    assert template.render_many(contexts[:10]) == [handwritten_readme(context) for context in contexts[:10]]
+    handwritten_seconds = best_of(args.repeat, lambda: [handwritten_readme(context) for context in contexts])
+    results['README.md (hand-written)'] = {
+        'render_us': handwritten_seconds * 1e6 / args.contexts,
+        'batch_ms': handwritten_seconds * 1e3,
+    }
+    print(f"{'README.md (hand-written)':<28} {handwritten_seconds * 1e6 / args.contexts:10.2f} "
+          f"{handwritten_seconds * 1e3:9.2f}")
+
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as file:
+            json.dump({'contexts': args.contexts, 'repeat': args.repeat, 'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""check_startup.py
+A cold-start budget check for the command-line entry points.
+
+This script imports each entry point in a fresh interpreter under
+`python -X importtime`, takes the best of several runs, and fails if the
+cumulative import time exceeds the budget or if any module that should only
+be loaded on demand (requests, urllib3, toml, packaging, asyncio, ...) is
+imported at startup, beyond what the bare interpreter already loads. The
+modules every scaffold loads are checked for such eager imports too. Run it
+in CI to catch eager imports creeping back in.
+
+Ex. Usage:
+python benchmarks/check_startup.py
+python benchmarks/check_startup.py --budget-ms 40 --runs 10
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ('main', 'src.cli')
+# Loaded by every scaffold: checked for eager imports only, not against the budget.
+SCAFFOLD_MODULES = ('src.project_setup', 'src.pyproject_configure', 'src.batch')
+LAZY_MODULES = ('requests', 'urllib3', 'charset_normalizer', 'certifi', 'toml', 'packaging',
+                'asyncio', 'zipfile', 'zlib')
+IMPORTTIME_RE = re.compile(r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s*)(?P<name>\S+)')
+
+
+def import_profile(module):
+    """
+    Imports `module` in a fresh interpreter; None only starts the interpreter.
+
+    Returns:
+        tuple: (cumulative microseconds of `module`, set of imported module names).
+    """
+    code = f'import {module}' if module else 'pass'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_ROOT,
+                            check=True, capture_output=True, text=True)
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        imported.add(match.group('name'))
+        if match.group('name') == module:
+            cumulative = int(match.group('cumulative'))
+    return cumulative, imported
+
+
+def eager_imports(imported, baseline):
+    """
+    Returns the on-demand modules in `imported` that the bare interpreter does not load.
+    """
+    return sorted(name for name in imported - baseline if name.split('.')[0] in LAZY_MODULES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if CLI cold start regresses.")
+    parser.add_argument('--budget-ms', type=float, default=25.0, help="allowed cumulative import time per entry point")
+    parser.add_argument('--runs', type=int, default=5, help="best-of runs per entry point")
+    args = parser.parse_args(argv)
+
+    # Modules the interpreter loads by itself (site, .pth files) do not count.
+    _, baseline = import_profile(None)
+    failures = []
+    for module in ENTRY_POINTS:
+        best = None
+        imported = set()
+        for _ in range(args.runs):
+            cumulative, imported = import_profile(module)
+            best = cumulative if best is None else min(best, cumulative)
+        eager = eager_imports(imported, baseline)
+        print(f"{module:<10} {best / 1000:7.2f} ms (budget {args.budget_ms:.1f} ms)")
+        if best / 1000 > args.budget_ms:
+            failures.append(f"{module} imports in {best / 1000:.2f} ms, over the {args.budget_ms:.1f} ms budget")
+        if eager:
+            failures.append(f"{module} eagerly imports {', '.join(eager)}")
+    for module in SCAFFOLD_MODULES:
+        _, imported = import_profile(module)
+        eager = eager_imports(imported, baseline)
+        if eager:
+            failures.append(f"{module} eagerly imports {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
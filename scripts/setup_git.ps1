@@ -1,8 +1,13 @@
-# Parse the conf.ini file
-$iniContent = Get-Content -Path 'config/conf.ini' -Raw
-$gitSection = ($iniContent -split '\n\n' | Where-Object { $_ -match '^\[git\]' }) -split '\n' | Select-Object -Skip 1
-$username = ($gitSection | Where-Object { $_ -match '^username' }).Split('=')[1].Trim()
-$repo_name = ($gitSection | Where-Object { $_ -match '^repo_name' }).Split('=')[1].Trim()
+# Use the values exported by ProjectSetup, and only parse the conf.ini file
+# when the script is run on its own
+$username = $env:SPD_GIT_USERNAME
+$repo_name = $env:SPD_GIT_REPO_NAME
+if (-not $username -or -not $repo_name) {
+    $iniContent = Get-Content -Path 'config/conf.ini' -Raw
+    $gitSection = ($iniContent -split '\n\n' | Where-Object { $_ -match '^\[git\]' }) -split '\n' | Select-Object -Skip 1
+    $username = ($gitSection | Where-Object { $_ -match '^username' }).Split('=')[1].Trim().Trim('"')
+    $repo_name = ($gitSection | Where-Object { $_ -match '^repo_name' }).Split('=')[1].Trim().Trim('"')
+}
 
 # Check if git has already been initialized
 if (Test-Path .git) {
@@ -1,8 +1,9 @@
 #!/bin/bash
 
-# Parse the conf.ini file
-username=$(awk -F '=' '/^\[git\]/{f=1} f==1 && /^username/{print $2; exit}' config/conf.ini | tr -d '[:space:]')
-repo_name=$(awk -F '=' '/^\[git\]/{f=1} f==1 && /^repo_name/{print $2; exit}' config/conf.ini | tr -d '[:space:]')
+# Use the values exported by ProjectSetup (see `python -m src.settings export-env`),
+# and only parse the conf.ini file when the script is run on its own
+username=${SPD_GIT_USERNAME:-$(awk -F '=' '/^\[git\]/{f=1} f==1 && /^username/{print $2; exit}' config/conf.ini | tr -d '[:space:]"')}
+repo_name=${SPD_GIT_REPO_NAME:-$(awk -F '=' '/^\[git\]/{f=1} f==1 && /^repo_name/{print $2; exit}' config/conf.ini | tr -d '[:space:]"')}
 
 # Check if git has already been initialized
 if [ -d ".git" ]; then
@@ -0,0 +1,443 @@
+"""batch.py
+A batch scaffolding engine that generates many projects from a manifest.
+
+This module provides the `BatchScaffolder` class, which reads a manifest such
+as `data/data.json` and builds one project directory per entry of its `names`
+list on a thread or process pool. Work that is identical across projects is
+done once up front: templates are fetched through the shared template cache,
+and requirements.txt (with its lockfile, resolved once), pyproject.toml,
+.gitignore, LICENSE and .pylintrc are rendered a single time. The pool then
+only performs the per-project local work of staging those contents and
+generating the README; on a thread pool every file of the batch is committed
+through one FileEmitter, so the whole batch is flushed to disk once. Virtual
+environments are materialized from one shared base environment. Completed
+(project, step) pairs are journaled in the output directory, so an
+interrupted batch can be resumed where it stopped.
+
+Ex. Usage:
+scaffolder = BatchScaffolder('config/conf.ini', output_dir='build', workers=8)
+results = scaffolder.run('data/data.json', resume=True)
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.build_state import fingerprint, write_if_changed
+from src.file_emitter import FileEmitter
+from src.git_repository import GitIdentity, initialize_repository, push_repositories
+from src.instrumentation import recorder, timed
+from src.journal import JOURNAL_FILE, BatchJournal
+from src.license_creator import LICENSE_BASE_URL, LicenseCreator
+from src.project_generator import GITIGNORE_BASE_URL, ProjectGenerator
+from src.project_setup import GIT_TRACKED_FILES, LOCK_FILE, ProjectSetup
+from src.pylintrc_provider import pylint_overrides
+from src.pyproject_configure import PyProjectConfigurer
+from src.readme_generator import README_TEMPLATE, READMEGenerator
+from src.settings import load_settings
+from src.template_cache import TemplateCache
+from src.templating import compile_template, find_template
+from src.venv_provisioner import VenvProvisioner
+
+
+class ManifestError(ValueError):
+    """
+    Raised for a manifest whose project names cannot each get their own directory.
+    """
+
+
+def slugify(name):
+    """
+    Converts a display name into a directory name.
+
+    Args:
+        name (str): A project name such as 'Prime Number Finder'.
+
+    Returns:
+        str: A lowercase, underscore-separated name such as 'prime_number_finder'.
+    """
+    return re.sub(r'[^0-9a-zA-Z]+', '_', name).strip('_').lower()
+
+
+def load_manifest(manifest_path):
+    """
+    Reads the list of project names from a JSON manifest.
+
+    Args:
+        manifest_path (str): Path to a JSON file with a `names` list.
+
+    Returns:
+        list: The project names, in manifest order, without duplicates.
+
+    Raises:
+        ManifestError: If a name has no directory name, or two distinct names
+        (such as 'Foo Bar' and 'foo_bar') map to the same directory.
+    """
+    with open(manifest_path, mode='r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    names = list(dict.fromkeys(manifest['names']))
+    directories = {}
+    for name in names:
+        directory = slugify(name)
+        if not directory:
+            raise ManifestError(f"project name {name!r} has no letters or digits to name a directory")
+        if directory in directories:
+            raise ManifestError(f"project names {directories[directory]!r} and {name!r} would both be "
+                                f"created in {directory!r}")
+        directories[directory] = name
+    return names
+
+
+@timed('BatchScaffolder')
+def materialize_venv(project_dir, provisioner, requirements=()):
+    """
+    Materializes a project's `.venv` from the shared base environment.
+    """
+    if not os.path.exists(os.path.join(project_dir, '.venv')):
+        os.makedirs(project_dir, exist_ok=True)
+        provisioner.materialize(os.path.join(project_dir, '.venv'), requirements)
+
+
+@timed('BatchScaffolder')
+def materialize_project(project_dir, shared_files, provisioner=None, requirements=(), emitter=None,
+                        readme_template=README_TEMPLATE, readme_metadata=None):
+    """
+    Writes the shared artifacts into one project directory and adds its README.
+
+    This is the per-project unit of work run on the pool. It is a module-level
+    function so that it can be dispatched to a process pool.
+
+    Args:
+        project_dir (str): The directory to create and populate.
+        shared_files (dict): Mapping of relative file names to their contents.
+        provisioner (VenvProvisioner): If given, materialize a `.venv` with it.
+        requirements (iterable): Requirements installed in the `.venv`.
+        emitter (FileEmitter): Stage the files here and leave the commit to
+        the caller; by default the project's files are committed on return.
+        readme_template (str): The README template text. It is compiled once
+        per process and reused for every project.
+        readme_metadata (dict): The [Metadata] values README templates see.
+
+    Returns:
+        str: The project directory.
+    """
+    own_emitter = emitter is None
+    if own_emitter:
+        emitter = FileEmitter()
+    with emitter.activate():
+        for file_name, content in shared_files.items():
+            write_if_changed(os.path.join(project_dir, file_name), content)
+        template = compile_template(readme_template, 'README.md')
+        READMEGenerator(repo_path=project_dir, template=template, metadata=readme_metadata).generate_readme()
+    if own_emitter:
+        emitter.commit()
+    if provisioner is not None:
+        materialize_venv(project_dir, provisioner, requirements)
+    return project_dir
+
+
+def run_recorded(record, func, *args):
+    """
+    Runs `func` in a pool worker, recording it if the parent process records.
+
+    Returns:
+        tuple: (the result of `func`, the worker recorder's snapshot, or None
+        when `record` is False). The parent merges the snapshot into its own
+        recorder, so process-pool work shows up in its metrics and trace.
+    """
+    if not record:
+        return func(*args), None
+    # Also drops whatever a forked worker inherited from the parent.
+    recorder.enable()
+    try:
+        return func(*args), recorder.snapshot()
+    finally:
+        recorder.disable()
+
+
+class BatchScaffolder:
+    """
+    A class to scaffold many projects in parallel from a single configuration.
+
+    All projects in a batch share the configuration file, so every artifact
+    derived only from it (and from remote templates) is computed once and
+    reused, leaving the pool with the per-project file writes.
+    """
+
+    def __init__(self, config_path='config/conf.ini', output_dir='projects', workers=None,
+                 use_processes=False, gitignore_templates=('Python',), with_venv=False,
+                 with_pylintrc=True, cache=None, install_dependencies=False, provisioner=None,
+                 gitignore_base_url=GITIGNORE_BASE_URL, license_base_url=LICENSE_BASE_URL, bundle=None,
+                 with_git=False, push=False):
+        """
+        Initializes a new instance of the BatchScaffolder class.
+
+        Args:
+            config_path (str): Path to the conf.ini shared by all projects.
+            output_dir (str): Directory under which project directories are made.
+            workers (int): Pool size; defaults to the executor's own default.
+            use_processes (bool): Use a process pool instead of a thread pool.
+            gitignore_templates (tuple): .gitignore templates to combine.
+            with_venv (bool): Whether to create a virtual environment per project.
+            with_pylintrc (bool): Whether to write a default .pylintrc.
+            cache (TemplateCache): The template cache to fetch through.
+            install_dependencies (bool): Install the [Dependencies] packages
+            into each project's virtual environment.
+            provisioner (VenvProvisioner): The provisioner used for `.venv`s.
+            gitignore_base_url (str): Where .gitignore templates are fetched from.
+            license_base_url (str): Where license texts are fetched from.
+            bundle (TemplateBundle): The offline template pack; False disables it.
+            with_git (bool): Initialize a git repository per project, in-process.
+            push (bool): Push every new repository in one concurrent phase
+            after the whole batch is built.
+        """
+        self.config_path = config_path
+        self.output_dir = output_dir
+        self.workers = workers
+        self.use_processes = use_processes
+        self.gitignore_templates = list(gitignore_templates)
+        self.with_venv = with_venv
+        self.with_pylintrc = with_pylintrc
+        self.cache = cache if cache is not None else TemplateCache()
+        self.install_dependencies = install_dependencies
+        self.provisioner = provisioner if provisioner is not None else VenvProvisioner()
+        self.gitignore_base_url = gitignore_base_url
+        self.license_base_url = license_base_url
+        self.bundle = bundle
+        self.with_git = with_git or push
+        self.push = push
+        self.failures = {}
+
+    @timed('BatchScaffolder')
+    def render_shared_files(self):
+        """
+        Renders every artifact that is identical across the batch.
+
+        Returns:
+            dict: Mapping of relative file names to their contents.
+        """
+        setup = ProjectSetup(config_path=self.config_path)
+        generator = ProjectGenerator(cache=self.cache, base_url=self.gitignore_base_url, bundle=self.bundle)
+        license_creator = LicenseCreator(config=setup.config, cache=self.cache, base_url=self.license_base_url,
+                                         bundle=self.bundle)
+        # Warm every remote template in one concurrent round-trip.
+        urls = [generator.template_url(name) for name in self.gitignore_templates
+                if not (generator.bundle and ('gitignore', name) in generator.bundle)]
+        if not (license_creator.bundle and ('license', setup.config['Settings']['License']) in license_creator.bundle):
+            urls.append(license_creator.license_url())
+        self.cache.prefetch(urls)
+        files = {
+            'requirements.txt': setup.render_requirements(),
+            'pyproject.toml': PyProjectConfigurer(config_path=self.config_path).render_pyproject_toml(),
+            '.gitignore': generator.render_gitignore(self.gitignore_templates),
+        }
+        lockfile = setup.render_lockfile()
+        if lockfile is not None:
+            files[LOCK_FILE] = lockfile
+        license_text = license_creator.render_license()
+        if license_text is not None:
+            files['LICENSE'] = license_text
+        if self.with_pylintrc:
+            try:
+                files['.pylintrc'] = setup.pylintrc_provider.render(pylint_overrides(setup.config))
+            except (OSError, subprocess.CalledProcessError) as err:
+                print(f"Skipping .pylintrc: {err}")
+        return files
+
+    def readme_template(self):
+        """
+        Returns the README template text: the configured README.md.tmpl, or the default.
+        """
+        template = find_template(load_settings(self.config_path), 'README.md')
+        return template.source if template is not None else README_TEMPLATE
+
+    def run(self, manifest_path, emitter=None, resume=False):
+        """
+        Scaffolds every project listed in the manifest.
+
+        Every (project, step) pair is checkpointed in a journal in the output
+        directory once its effects are on disk: 'files' after the project's
+        files are committed (also those staged in `emitter`), 'venv' after
+        its environment is materialized.
+        A failing project is journaled and the rest of the batch continues.
+
+        Args:
+            manifest_path (str): Path to a JSON manifest with a `names` list.
+            emitter (FileEmitter): Stage every file here instead of in a
+            private emitter; it is committed before the git phase, which
+            snapshots the files from disk. In dry-run mode the diff is left
+            to the caller, and virtual environments are not created and
+            nothing is journaled.
+            resume (bool): Skip the pairs the journal of an earlier run
+            records as done with the same inputs, and retry the others.
+
+        Returns:
+            list: The completed project directories, in manifest order.
+            Failures are left in `self.failures` as {(project, step): error}.
+
+        Raises:
+            ValueError: If an emitter is given together with a process pool.
+            ManifestError: If two project names map to the same directory.
+        """
+        if emitter is not None and self.use_processes:
+            raise ValueError("a shared FileEmitter cannot be used with a process pool")
+        dry_run = emitter is not None and emitter.dry_run
+        names = load_manifest(manifest_path)
+        shared_files = self.render_shared_files()
+        setup = ProjectSetup(config_path=self.config_path)
+        readme = (self.readme_template(), dict(setup.config.metadata.items()))
+        provisioner = None
+        requirements = []
+        if self.with_venv and not dry_run:
+            provisioner = self.provisioner
+            if self.install_dependencies:
+                requirements = setup.dependency_names()
+        project_dirs = [os.path.join(self.output_dir, slugify(name)) for name in names]
+        journal = None if dry_run else BatchJournal(os.path.join(self.output_dir, JOURNAL_FILE), resume=resume)
+        digests = {'files': fingerprint(sorted(shared_files.items()), readme)}
+        if provisioner is not None:
+            digests['venv'] = fingerprint(provisioner.key(requirements), provisioner.mode)
+        if self.with_git and not dry_run:
+            digests['git'] = fingerprint(digests['files'], setup.git_remote_url('{name}'))
+            if self.push:
+                digests['push'] = digests['git']
+
+        def pending(step):
+            return [path for path in project_dirs if journal is None or not journal.is_done(path, step, digests[step])]
+
+        if provisioner is not None and pending('venv'):
+            # Build the base environment once, before the pool fans out.
+            provisioner.base_env(requirements)
+        self.failures = {}
+        if self.use_processes:
+            self._run_processes(journal, digests, pending, shared_files, readme, provisioner, requirements)
+        else:
+            self._run_threads(journal, digests, pending, shared_files, readme, emitter, provisioner, requirements)
+        if 'git' in digests:
+            self._run_git(journal, digests, pending, setup)
+        for (project_dir, step), error in self.failures.items():
+            print(f"Failed {step} for {project_dir}: {error}")
+        failed = {project_dir for project_dir, _ in self.failures}
+        return [path for path in project_dirs if path not in failed]
+
+    def _run_threads(self, journal, digests, pending, shared_files, readme, emitter, provisioner, requirements):
+        batch_emitter = emitter if emitter is not None else FileEmitter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                project_dir: executor.submit(materialize_project, project_dir, shared_files, None, (), batch_emitter,
+                                             *readme)
+                for project_dir in pending('files')
+            }
+            completed = []
+            for project_dir, future in futures.items():
+                try:
+                    completed.append(future.result())
+                except Exception as err:  # pylint: disable=broad-exception-caught
+                    self.failures[(project_dir, 'files')] = str(err)
+        # Even a caller's emitter is committed here: 'files' may only be journaled once the files are on
+        # disk, or a crash in between would make --resume skip them, and the git phase reads them from disk.
+        batch_emitter.commit()
+        if journal is not None:
+            # One append covers the whole batch.
+            journal.record_many([(path, 'files', 'done', digests['files'], None) for path in completed])
+            journal.record_many([(path, 'files', 'failed', digests['files'], error)
+                                 for (path, _), error in self.failures.items()])
+        if provisioner is None:
+            return
+        failed = {project_dir for project_dir, _ in self.failures}
+        targets = [path for path in pending('venv') if path not in failed]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                project_dir: executor.submit(self._checkpointed_venv, journal, digests, project_dir, provisioner,
+                                             requirements)
+                for project_dir in targets
+            }
+            for project_dir, future in futures.items():
+                try:
+                    future.result()
+                except Exception as err:  # pylint: disable=broad-exception-caught
+                    self.failures[(project_dir, 'venv')] = str(err)
+
+    def _checkpointed_venv(self, journal, digests, project_dir, provisioner, requirements):
+        venv_path = os.path.join(project_dir, '.venv')
+        if journal is not None and journal.resume and os.path.lexists(venv_path):
+            # Not journaled as done, so this is what an interrupted run left.
+            shutil.rmtree(venv_path)
+        try:
+            materialize_venv(project_dir, provisioner, requirements)
+        except Exception as err:
+            if journal is not None:
+                journal.record(project_dir, 'venv', 'failed', digests['venv'], str(err))
+            raise
+        if journal is not None:
+            journal.record(project_dir, 'venv', 'done', digests['venv'])
+
+    def _run_git(self, journal, digests, pending, setup):
+        identity = GitIdentity.detect(setup.config.git_username)
+
+        def init(project_dir):
+            git_dir = os.path.join(project_dir, '.git')
+            if journal is not None and journal.resume and os.path.lexists(git_dir):
+                # Not journaled as done, so this is what an interrupted run left.
+                shutil.rmtree(git_dir)
+            initialize_repository(project_dir, GIT_TRACKED_FILES, identity=identity,
+                                  remote_url=setup.git_remote_url(os.path.basename(project_dir)))
+
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {path: executor.submit(init, path) for path in self._targets(pending, 'git')}
+        for path, future in futures.items():
+            try:
+                future.result()
+                errors[path] = None
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                errors[path] = str(err)
+        self._record(journal, digests, 'git', errors)
+        if 'push' in digests:
+            # Deferred until every repository exists, then run concurrently.
+            errors = push_repositories(self._targets(pending, 'push'), max_workers=self.workers or 8)
+            self._record(journal, digests, 'push', errors)
+
+    def _targets(self, pending, step):
+        failed = {project_dir for project_dir, _ in self.failures}
+        return [path for path in pending(step) if path not in failed]
+
+    def _record(self, journal, digests, step, errors):
+        for path, error in errors.items():
+            if error is not None:
+                self.failures[(path, step)] = error
+        if journal is not None:
+            journal.record_many([(path, step, 'failed' if error else 'done', digests[step], error)
+                                 for path, error in errors.items()])
+
+    def _run_processes(self, journal, digests, pending, shared_files, readme, provisioner, requirements):
+        steps = [step for step in ('files', 'venv') if step in digests]
+        pending_steps = {step: set(pending(step)) for step in steps}
+        todo = list(dict.fromkeys(path for step in steps for path in pending(step)))
+        if journal is not None and journal.resume and provisioner is not None:
+            for project_dir in pending_steps['venv']:
+                # Not journaled as done, so this is what an interrupted run left.
+                if os.path.lexists(os.path.join(project_dir, '.venv')):
+                    shutil.rmtree(os.path.join(project_dir, '.venv'))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                project_dir: executor.submit(run_recorded, recorder.enabled, materialize_project, project_dir,
+                                             shared_files, provisioner, requirements, None, *readme)
+                for project_dir in todo
+            }
+            for project_dir, future in futures.items():
+                try:
+                    _, snapshot = future.result()
+                    if snapshot is not None:
+                        recorder.merge(snapshot)
+                except Exception as err:  # pylint: disable=broad-exception-caught
+                    step = next(step for step in steps if project_dir in pending_steps[step])
+                    self.failures[(project_dir, step)] = str(err)
+                    if journal is not None:
+                        journal.record(project_dir, step, 'failed', digests[step], str(err))
+                    continue
+                if journal is not None:
+                    journal.record_many([(project_dir, step, 'done', digests[step], None) for step in steps])
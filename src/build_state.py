@@ -0,0 +1,171 @@
+"""build_state.py
+Build manifest support for incremental, idempotent re-runs.
+
+This module provides the `BuildState` class, which records a fingerprint of
+each scaffolding step's inputs in a `.scaffold-state.json` manifest so that a
+re-run can skip steps whose inputs have not changed. `write_if_changed`, which
+leaves a file (and its mtime) untouched when the new content matches what is
+already on disk, lives in `src.file_emitter` and is re-exported here.
+
+Ex. Usage:
+state = BuildState('.')
+digest = fingerprint(section_items(config, 'Dependencies'))
+if not state.is_current('requirements', digest, ['requirements.txt']):
+    write_if_changed('requirements.txt', content)
+    state.record('requirements', digest)
+state.save()
+"""
+
+import hashlib
+import json
+import os
+from importlib import metadata
+
+from src.file_emitter import active_emitter, write_if_changed
+
+STATE_FILE = '.scaffold-state.json'
+DIGEST_CHUNK_SIZE = 1 << 16
+
+
+def fingerprint(*parts):
+    """
+    Hashes an arbitrary sequence of values into a stable hex digest.
+
+    Args:
+        *parts: Strings, bytes or JSON-serializable values.
+
+    Returns:
+        str: The SHA-256 hex digest of the parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        elif not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """
+    Hashes the contents of a file.
+
+    Args:
+        path (str): The file to hash.
+
+    Returns:
+        str: The SHA-256 hex digest, or 'missing' if the file does not exist
+        and 'dir' if it is a directory. Content staged in the active
+        FileEmitter takes precedence over the file on disk.
+    """
+    if os.path.isdir(path):
+        return 'dir'
+    emitter = active_emitter()
+    staged = emitter.read(path) if emitter is not None else None
+    if staged is not None:
+        return hashlib.sha256(staged.encode('utf-8')).hexdigest()
+    digest = hashlib.sha256()
+    try:
+        with open(path, mode='rb') as file:
+            # Not hashlib.file_digest, which needs Python 3.11.
+            for chunk in iter(lambda: file.read(DIGEST_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return 'missing'
+    return digest.hexdigest()
+
+
+def tool_version(distribution):
+    """
+    Looks up the installed version of a distribution without importing it.
+
+    Args:
+        distribution (str): The distribution name, e.g. 'pylint'.
+
+    Returns:
+        str: The version string, or None if it is not installed.
+    """
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def section_items(config, *sections):
+    """
+    Extracts the given config sections as plain, order-preserving data.
+
+    Args:
+        config (configparser.ConfigParser): The parsed configuration.
+        *sections (str): The section names to extract.
+
+    Returns:
+        dict: Mapping of section name to a list of (key, value) pairs.
+    """
+    return {
+        section: list(config[section].items()) if config.has_section(section) else None
+        for section in sections
+    }
+
+
+class BuildState:
+    """
+    A persistent record of the input fingerprint of each completed step.
+    """
+
+    def __init__(self, project_dir='.', file_name=STATE_FILE):
+        """
+        Initializes a new instance of the BuildState class.
+
+        Args:
+            project_dir (str): The project the manifest belongs to.
+            file_name (str): The manifest file name inside `project_dir`.
+        """
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, file_name)
+        try:
+            with open(self.path, mode='r', encoding='utf-8') as file:
+                self.steps = json.load(file).get('steps', {})
+        except (OSError, ValueError):
+            self.steps = {}
+        self._dirty = False
+
+    def is_current(self, step, digest, outputs=()):
+        """
+        Checks whether a step can be skipped.
+
+        Args:
+            step (str): The step name.
+            digest (str): The fingerprint of the step's current inputs.
+            outputs (iterable): Paths, relative to the project, that the step
+            produces; all of them must still exist.
+
+        Returns:
+            bool: True if the recorded fingerprint matches and outputs exist.
+        """
+        return self.steps.get(step) == digest and all(
+            os.path.exists(os.path.join(self.project_dir, output)) for output in outputs
+        )
+
+    def record(self, step, digest):
+        """
+        Records the fingerprint a step completed with.
+        """
+        if self.steps.get(step) != digest:
+            self.steps[step] = digest
+            self._dirty = True
+
+    def save(self):
+        """
+        Writes the manifest atomically if any fingerprint changed.
+
+        Inside an active FileEmitter the manifest is staged with the step
+        outputs, so it is committed in the same batch as the files it
+        describes.
+        """
+        if not self._dirty:
+            return
+        write_if_changed(self.path, json.dumps({'version': 1, 'steps': self.steps}, indent=2, sort_keys=True) + '\n')
+        self._dirty = False
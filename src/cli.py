@@ -0,0 +1,350 @@
+"""cli.py
+The command-line interface, with subcommands and lazily imported components.
+
+Only argparse is loaded at startup. Each subcommand imports the components
+it uses when it runs, so `--help`, `settings` or a dry run never pay for
+loading requests, urllib3, toml or asyncio unless they are actually used.
+`main.py` keeps the original flat flags and forwards to the same commands.
+
+Subcommands:
+    scaffold   Scaffold the current directory (the default of main.py).
+    batch      Scaffold one project per name in a JSON manifest.
+    bundle     Build or inspect the offline template bundle.
+    settings   Export conf.ini values as environment variables.
+    watch      Regenerate the affected files whenever an input changes.
+
+Ex. Usage:
+python -m src.cli scaffold --offline --dry-run
+python -m src.cli batch data/data.json --workers 8 --git --resume
+python -m src.cli watch --debounce-ms 50
+"""
+
+# pylint: disable=import-outside-toplevel
+
+import argparse
+import os
+import sys
+
+DEFAULT_CONFIG_PATH = 'config/conf.ini'
+
+
+def add_common_arguments(parser):
+    """
+    Adds the options shared by `scaffold`, `batch` and main.py's flat flags.
+    """
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="path to conf.ini")
+    parser.add_argument('--offline', action='store_true',
+                        help="never use the network; "
+                             "serve templates from the bundle and cache only")
+    parser.add_argument('--metrics-json', metavar='PATH',
+                        help="write per-step timing and I/O metrics to PATH")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="write a Chrome trace (chrome://tracing, Perfetto) to PATH")
+    parser.add_argument('--openmetrics', metavar='PATH',
+                        help="write per-step counters in OpenMetrics text to PATH")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="print a unified diff of the files that would change "
+                             "instead of writing them")
+    parser.add_argument('--push', action='store_true',
+                        help="push the new repositories to their origin "
+                             "in one final, concurrent phase")
+
+
+def add_scaffold_arguments(parser):
+    """
+    Adds the options that only apply to scaffolding the current directory.
+    """
+    parser.add_argument('--force', action='store_true',
+                        help="ignore .scaffold-state.json and rerun every step")
+
+
+def add_batch_arguments(parser):
+    """
+    Adds the options that only apply to batch runs.
+    """
+    parser.add_argument('--output-dir', default='projects', help="where batch projects are created")
+    parser.add_argument('--workers', type=int, default=None, help="batch pool size")
+    parser.add_argument('--processes', action='store_true', help="use a process pool")
+    parser.add_argument('--venv', action='store_true',
+                        help="create a virtual environment per project")
+    parser.add_argument('--install-deps', action='store_true',
+                        help="install [Dependencies] into the environments")
+    parser.add_argument('--git', action='store_true',
+                        help="initialize a git repository per project")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip the projects and steps the journal of an earlier run completed")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='setup-project', description="Scaffold Python projects.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scaffold = commands.add_parser('scaffold', help="scaffold the current directory")
+    add_common_arguments(scaffold)
+    add_scaffold_arguments(scaffold)
+
+    batch = commands.add_parser('batch', help="scaffold one project per name in a JSON manifest")
+    batch.add_argument('manifest', help="JSON manifest with a `names` list, e.g. data/data.json")
+    add_common_arguments(batch)
+    add_batch_arguments(batch)
+
+    watch = commands.add_parser('watch',
+                                help="regenerate the affected files whenever an input changes")
+    watch.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="path to conf.ini")
+    watch.add_argument('--offline', action='store_true',
+                       help="never use the network; serve templates from the bundle and cache only")
+    watch.add_argument('--debounce-ms', type=float, default=50.0,
+                       help="quiet time that ends a burst of changes")
+    watch.add_argument('--poll', action='store_true',
+                       help="poll for changes instead of using inotify")
+
+    bundle = commands.add_parser('bundle', help="build or inspect the offline template bundle",
+                                 add_help=False)
+    bundle.add_argument('args', nargs=argparse.REMAINDER)
+
+    settings = commands.add_parser('settings',
+                                   help="export conf.ini values as environment variables",
+                                   add_help=False)
+    settings.add_argument('args', nargs=argparse.REMAINDER)
+    return parser
+
+
+def run_command(args):
+    """
+    Runs a parsed `scaffold` or `batch` command, recording and exporting metrics if asked.
+
+    Returns:
+        int: The process exit status.
+    """
+    if not os.path.exists(args.config):
+        print(f"Error: Config file not found at {args.config}")
+        return 1
+    exports = [(path, method) for path, method in (
+        (args.metrics_json, 'dump'),
+        (args.trace, 'dump_chrome_trace'),
+        (args.openmetrics, 'dump_openmetrics'),
+    ) if path]
+    if exports:
+        from src.instrumentation import recorder
+        recorder.enable()
+    try:
+        if args.command == 'batch':
+            return run_batch(args)
+        return run_scaffold(args)
+    finally:
+        if exports:
+            recorder.disable()
+            for path, method in exports:
+                getattr(recorder, method)(path)
+
+
+def run_batch(args):
+    from src.batch import BatchScaffolder, ManifestError
+    from src.file_emitter import FileEmitter
+    from src.template_cache import TemplateCache
+
+    if args.dry_run and args.processes:
+        print("Error: --dry-run cannot be combined with --processes")
+        return 2
+    emitter = FileEmitter(dry_run=args.dry_run)
+    scaffolder = BatchScaffolder(
+        config_path=args.config,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        use_processes=args.processes,
+        with_venv=args.venv,
+        install_dependencies=args.install_deps,
+        cache=TemplateCache(offline=args.offline),
+        with_git=args.git or args.push,
+        push=args.push,
+    )
+    try:
+        project_dirs = scaffolder.run(args.manifest, emitter=None if args.processes else emitter,
+                                      resume=args.resume)
+    except ManifestError as err:
+        print(f"Error: {err}")
+        return 2
+    if args.dry_run:
+        print(emitter.diff() or "No changes.", end='')
+        return 0
+    for project_dir in project_dirs:
+        print(f"Created {project_dir}")
+    if scaffolder.failures:
+        print(f"{len(scaffolder.failures)} step(s) failed; "
+              "rerun with --resume to retry only those.")
+        return 1
+    return 0
+
+
+def create_components(config_path, cache):
+    """
+    Creates the single-project components from the current conf.ini.
+
+    Returns:
+        tuple: (project_setup, generator, configurer, readme_generator, license_creator).
+    """
+    from src.license_creator import LicenseCreator
+    from src.project_generator import ProjectGenerator
+    from src.project_setup import ProjectSetup
+    from src.pyproject_configure import PyProjectConfigurer
+    from src.readme_generator import READMEGenerator
+    from src.templating import find_template
+
+    project_setup = ProjectSetup(config_path=config_path)
+    config = project_setup.config
+    return (
+        project_setup,
+        ProjectGenerator(cache=cache),
+        PyProjectConfigurer(config_path=config_path),
+        READMEGenerator(template=find_template(config, 'README.md'), metadata=config.metadata),
+        LicenseCreator(config=config, cache=cache),
+    )
+
+
+def run_scaffold(args):
+    from src.build_state import BuildState
+    from src.file_emitter import FileEmitter
+
+    # Initialize ProjectSetup, Generator, and READMEGenerator
+    try:
+        from src.template_cache import TemplateCache
+
+        components = create_components(args.config, TemplateCache(offline=args.offline))
+    except ImportError as err:
+        print(f"Error initializing classes: {err}")
+        return 1
+    project_setup = components[0]
+
+    emitter = FileEmitter(dry_run=args.dry_run)
+    pipeline = build_pipeline(args.config, *components, files_only=args.dry_run)
+    state = None if args.force or args.dry_run else BuildState('.')
+    with emitter.activate():
+        results = pipeline.run(state)
+    emitter.commit()
+    status = 0
+    for result in results.values():
+        if result.status == 'failed':
+            print(f"Error in step {result.name}: {result.error}")
+            status = 1
+        elif result.status == 'skipped':
+            print(f"Skipped step {result.name}: {result.error}")
+    if args.dry_run:
+        print(emitter.diff() or "No changes.", end='')
+    elif args.push:
+        from src.git_repository import push_repositories
+        for work_tree, error in push_repositories([project_setup.project_dir]).items():
+            print(f"Push of {work_tree} failed: {error}" if error else f"Pushed {work_tree}")
+            status = status or (1 if error else 0)
+    return status
+
+
+def run_watch(args):
+    """
+    Keeps the generated files of the current directory up to date until interrupted.
+
+    Returns:
+        int: The process exit status.
+    """
+    if not os.path.exists(args.config):
+        print(f"Error: Config file not found at {args.config}")
+        return 1
+    from src.settings import load_settings
+    from src.template_cache import TemplateCache
+    from src.watcher import watch
+
+    cache = TemplateCache(offline=args.offline)
+    roots = ['.', os.path.dirname(os.path.abspath(args.config))]
+    template_dir = load_settings(args.config).get('Templates', 'directory')
+    if template_dir and os.path.isdir(template_dir):
+        roots.append(template_dir)
+    try:
+        watch(lambda: build_pipeline(args.config, *create_components(args.config, cache),
+                                     files_only=True),
+              roots=roots, debounce=args.debounce_ms / 1000, polling=args.poll)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_pipeline(conf_path, project_setup, generator, configurer, readme_generator,
+                   license_creator, files_only=False):
+    """
+    Declares the single-project scaffolding steps and their file dependencies.
+
+    The first git commit contains the generated files, so the git step is
+    ordered after every step that writes one; everything else only depends
+    on the config file. Fingerprints name the external inputs of each step
+    so that re-runs with a build manifest skip the steps whose inputs are
+    unchanged. With `files_only`, the steps that act outside the FileEmitter
+    (virtual environment, git and shell scripts) are left out, as for a dry
+    run. Pushing is not a step; `--push` runs it after the pipeline. Template
+    files and, for the README, the whole project tree ('.') are declared as
+    inputs too, so that watch mode can map a changed file to its steps. Shell
+    scripts are killed after the [Scripts] `timeout`, in seconds
+    (`SCRIPT_TIMEOUT` by default).
+    """
+    from src.build_state import section_items, tool_version
+    from src.pipeline import Pipeline, Step
+    from src.project_generator import SCRIPT_TIMEOUT
+    from src.project_setup import GIT_TRACKED_FILES, LOCK_FILE
+    from src.pylintrc_provider import pylint_overrides
+    from src.templating import template_path, template_source
+
+    config = project_setup.config
+    index = project_setup.package_index()
+    script_timeout = float(config.get('Scripts', 'timeout', SCRIPT_TIMEOUT))
+    templates = {}
+    for file_name in ('README.md', 'pyproject.toml', 'LICENSE'):
+        path = template_path(config, file_name)
+        templates[file_name] = [path] if path else []
+    gitignore_templates = ['Python', 'Node']
+    steps = [
+        Step('requirements', project_setup.create_requirements, inputs=[conf_path],
+             outputs=['requirements.txt'] + ([LOCK_FILE] if index is not None else []),
+             fingerprint_func=lambda: [section_items(config, 'Dependencies', 'Resolver'),
+                                       index.fingerprint() if index is not None else None]),
+        Step('venv', project_setup.create_venv, outputs=['.venv'],
+             fingerprint_func=lambda: [sys.executable, sys.version]),
+        Step('pylintrc', project_setup.create_pylintrc, inputs=[conf_path], outputs=['.pylintrc'],
+             fingerprint_func=lambda: [tool_version('pylint'), pylint_overrides(config)]),
+        Step('git', project_setup.execute_git_setup, inputs=[conf_path, *GIT_TRACKED_FILES],
+             outputs=['.git'],
+             fingerprint_func=lambda: section_items(config, 'git')),
+        Step('gitignore', lambda: generator.generate_gitignore(gitignore_templates),
+             outputs=['.gitignore'],
+             fingerprint_func=lambda: generator.render_gitignore(gitignore_templates)),
+        Step('scripts',
+             lambda: generator.execute_script('scripts/backups/*.sh', timeout=script_timeout)),
+        Step('pyproject', configurer.configure_pyproject_toml,
+             inputs=[conf_path, *templates['pyproject.toml']], outputs=['pyproject.toml'],
+             fingerprint_func=lambda: [section_items(configurer.config, 'Metadata', 'Dependencies'),
+                                       tool_version('toml'), template_source(configurer.template)]),
+        Step('license', license_creator.create_license, inputs=[conf_path, *templates['LICENSE']],
+             outputs=['LICENSE'],
+             fingerprint_func=lambda: [section_items(config, 'Settings'), license_creator.base_url,
+                                       template_source(license_creator.template)]),
+        Step('readme', readme_generator.generate_readme,
+             inputs=['LICENSE', 'requirements.txt', conf_path, '.', *templates['README.md']],
+             outputs=['README.md'],
+             fingerprint_func=readme_generator.fingerprint),
+    ]
+    if files_only:
+        steps = [step for step in steps if step.name not in ('venv', 'git', 'scripts')]
+    return Pipeline(steps)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'bundle':
+        from src import template_bundle
+        return template_bundle.main(args.args)
+    if args.command == 'settings':
+        from src import settings
+        return settings.main(args.args)
+    if args.command == 'watch':
+        return run_watch(args)
+    return run_command(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""file_emitter.py
+An atomic, batched emission layer for generated files.
+
+This module provides the `FileEmitter` class. While an emitter is active,
+every generated artifact (requirements.txt, pyproject.toml, .gitignore,
+README.md, LICENSE, ...) is staged in memory instead of being written. On
+commit, the changed files are written to temporary siblings, flushed to
+stable storage with one `syncfs` per filesystem (or, where that is not
+available, one fsync per file), and moved into place with `os.replace`, so a
+crash never leaves a half-written file behind. In
+dry-run mode, commit only reports a unified diff and leaves the disk alone.
+
+`write_if_changed` is the single write path used by the generators: it stages into
+the active emitter if there is one and otherwise writes atomically right
+away. `read_file` lets later steps read what earlier steps staged.
+
+Ex. Usage:
+with FileEmitter(dry_run=True) as emitter:
+    ProjectSetup().create_requirements()
+print(emitter.diff())
+"""
+
+import contextlib
+import contextvars
+import difflib
+import functools
+import os
+import sys
+import tempfile
+import threading
+
+from src.instrumentation import recorder, timed
+
+_active = contextvars.ContextVar('active_file_emitter', default=None)
+
+
+def _read_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once, while the process is still single-threaded: os.umask can only be read by setting it.
+_UMASK = _read_umask()
+
+
+def _read_bytes(path):
+    try:
+        with open(path, mode='rb') as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_temp(path, data):
+    """
+    Writes `data` to a new temporary file next to `path` and returns its name.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    with os.fdopen(fd, mode='wb') as file:
+        file.write(data)
+    if os.path.exists(path):
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+    else:
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+    return tmp_path
+
+
+def _fsync_directory(directory):
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_syncfs():
+    """
+    Returns libc's syncfs(2), or None where the platform has no such call.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    import ctypes  # pylint: disable=import-outside-toplevel
+    import ctypes.util  # pylint: disable=import-outside-toplevel
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        syncfs = libc.syncfs
+    except (OSError, AttributeError):
+        return None
+    syncfs.argtypes = (ctypes.c_int,)
+    return syncfs
+
+
+def _syncfs(directory):
+    """
+    Flushes the whole filesystem holding `directory`; False if that failed.
+    """
+    syncfs = _load_syncfs()
+    if syncfs is None:
+        return False
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        return syncfs(fd) == 0
+    finally:
+        os.close(fd)
+
+
+class FileEmitter:
+    """
+    Stages generated files in memory and commits them atomically as a batch.
+    """
+
+    def __init__(self, dry_run=False, durable=True):
+        """
+        Initializes a new instance of the FileEmitter class.
+
+        Args:
+            dry_run (bool): If True, commit reports a diff instead of writing.
+            durable (bool): If True, flush data and directories to stable
+            storage before and after the files are moved into place.
+        """
+        self.dry_run = dry_run
+        self.durable = durable
+        self.staged = {}
+        self._lock = threading.Lock()
+
+    def stage(self, path, content):
+        """
+        Stages `content` for `path`, replacing any earlier staged content.
+
+        Args:
+            path (str): The destination file.
+            content (str): The file content.
+
+        Returns:
+            bool: True if the content differs from the file on disk.
+        """
+        data = content.encode('utf-8')
+        path = os.path.abspath(path)
+        changed = _read_bytes(path) != data
+        with self._lock:
+            if changed:
+                self.staged[path] = data
+            else:
+                self.staged.pop(path, None)
+        return changed
+
+    def read(self, path):
+        """
+        Returns the staged content of `path`, or None if nothing is staged.
+        """
+        data = self.staged.get(os.path.abspath(path))
+        return data.decode('utf-8') if data is not None else None
+
+    def diff(self):
+        """
+        Renders the staged changes as a unified diff against the disk.
+
+        Returns:
+            str: The diff text; empty if nothing would change.
+        """
+        chunks = []
+        for path in sorted(self.staged):
+            old = _read_bytes(path)
+            old_lines = old.decode('utf-8', errors='replace').splitlines(keepends=True) if old is not None else []
+            new_lines = self.staged[path].decode('utf-8').splitlines(keepends=True)
+            rel_path = os.path.relpath(path)
+            chunks.extend(difflib.unified_diff(
+                old_lines, new_lines,
+                fromfile='/dev/null' if old is None else f'a/{rel_path}',
+                tofile=f'b/{rel_path}',
+            ))
+        return ''.join(line if line.endswith('\n') else line + '\n' for line in chunks)
+
+    @timed('FileEmitter')
+    def commit(self):
+        """
+        Writes every staged file atomically, syncing the batch before renaming.
+
+        All files are written to temporary siblings first, then the batch is
+        flushed once: a single syncfs per filesystem the files live on, so
+        that the new files are durable before they replace their
+        destinations. syncfs also flushes unrelated dirty data on the same
+        filesystem; that is the price of one flush instead of one fsync per
+        file, and where syncfs is unavailable (or fails) every temporary and
+        its directory are fsynced instead. After the temporaries are renamed,
+        every affected directory is synced once more so the renames are
+        durable too.
+
+        Returns:
+            list: The paths that were (or, in dry-run mode, would be) written.
+        """
+        with self._lock:
+            staged, self.staged = self.staged, {}
+        paths = sorted(staged)
+        if self.dry_run or not paths:
+            if self.dry_run:
+                self.staged = staged
+            return paths
+        temporaries = []
+        try:
+            for path in paths:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temporaries.append((_write_temp(path, staged[path]), path))
+            if self.durable:
+                self._sync_data([tmp_path for tmp_path, _ in temporaries])
+            for tmp_path, path in temporaries:
+                os.replace(tmp_path, path)
+                recorder.add('bytes_written', len(staged[path]))
+                recorder.add('files_written', 1)
+        except BaseException:
+            for tmp_path, _ in temporaries:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(tmp_path)
+            raise
+        if self.durable:
+            for directory in sorted({os.path.dirname(path) for path in paths}):
+                _fsync_directory(directory)
+        return paths
+
+    @staticmethod
+    def _sync_data(tmp_paths):
+        directories = sorted({os.path.dirname(tmp_path) for tmp_path in tmp_paths})
+        filesystems = {}
+        for directory in directories:
+            filesystems.setdefault(os.stat(directory).st_dev, directory)
+        if all(_syncfs(directory) for directory in filesystems.values()):
+            return
+        for tmp_path in tmp_paths:
+            with open(tmp_path, mode='rb+') as file:
+                os.fsync(file.fileno())
+        for directory in directories:
+            _fsync_directory(directory)
+
+    def discard(self):
+        """
+        Drops every staged file.
+        """
+        with self._lock:
+            self.staged = {}
+
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        Routes `write_if_changed` calls in this context (and in threads started
+        through asyncio.to_thread from it) to this emitter.
+        """
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def __enter__(self):
+        self._token = _active.set(self)  # pylint: disable=attribute-defined-outside-init
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _active.reset(self._token)
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+def active_emitter():
+    """
+    Returns the emitter active in the current context, or None.
+    """
+    return _active.get()
+
+
+def write_if_changed(path, content):
+    """
+    Writes `content` to `path` only if it differs from the current content.
+
+    With an active emitter the file is staged; otherwise it is written
+    atomically through a temporary sibling and `os.replace`.
+
+    Args:
+        path (str): The file to write.
+        content (str): The desired file content.
+
+    Returns:
+        bool: True if the file was (or will be) written, False if current.
+    """
+    emitter = _active.get()
+    if emitter is not None:
+        return emitter.stage(path, content)
+    data = content.encode('utf-8')
+    if _read_bytes(path) == data:
+        return False
+    os.replace(_write_temp(path, data), path)
+    recorder.add('bytes_written', len(data))
+    recorder.add('files_written', 1)
+    return True
+
+
+def read_file(path):
+    """
+    Reads a text file, seeing content staged in the active emitter first.
+
+    Returns:
+        str: The file content, or None if the file neither is staged nor exists.
+    """
+    emitter = _active.get()
+    if emitter is not None:
+        text = emitter.read(path)
+        if text is not None:
+            return text
+    data = _read_bytes(path)
+    return data.decode('utf-8') if data is not None else None
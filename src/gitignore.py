@@ -0,0 +1,396 @@
+"""gitignore.py
+A compiler and fast in-process matcher for .gitignore rules.
+
+This module provides `compile_gitignore`, which parses any number of
+.gitignore templates into normalized `Rule`s, drops duplicates and rules that
+an equivalent or broader rule already covers, and emits a minimal file that
+ignores exactly the same paths, and `GitignoreMatcher`, which answers
+"is this path ignored?" without scanning every pattern. The matcher indexes
+rules by their literal part: exact names in a dict, `*.ext`-style rules by
+literal suffix, `name*`-style rules by literal prefix, and only the remaining
+patterns are tried as regular expressions.
+
+Like git, a path's fate is decided by the last rule that matches it, and
+nothing below an ignored directory is matched, so tree scanners are expected
+to prune ignored directories instead of descending into them.
+
+Ex. Usage:
+text = compile_gitignore([('Python', python_template), ('Node', node_template)])
+matcher = GitignoreMatcher.from_text(text)
+matcher.is_ignored('build/lib/module.py', is_dir=False)
+"""
+
+import functools
+import re
+
+from src.file_emitter import read_file
+
+WILDCARDS = frozenset('*?[')
+
+
+def has_wildcards(pattern):
+    """
+    Checks whether a gitignore glob contains `*`, `?` or `[`.
+    """
+    return any(char in WILDCARDS for char in pattern)
+
+
+def translate(pattern):
+    """
+    Translates a gitignore glob into a regular expression.
+
+    `*` and `?` never match '/', `**/` matches any number of directories and
+    a trailing `/**` matches everything inside a directory.
+    """
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == n:
+            parts.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif char == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif char == '?':
+            parts.append('[^/]')
+            i += 1
+        elif char == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith('[!', i) or pattern.startswith('[]', i) else i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+                i += 1
+                continue
+            body = pattern[i + 1:end].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append(f'[{body}]')
+            i = end + 1
+        elif char == '\\' and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(char))
+            i += 1
+    return ''.join(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    """
+    Returns a `fullmatch` function for a gitignore glob, compiled once.
+    """
+    return re.compile(translate(pattern)).fullmatch
+
+
+class Rule:
+    """
+    One normalized .gitignore rule.
+    """
+    __slots__ = ('pattern', 'negated', 'dir_only', 'anchored', 'source')
+
+    def __init__(self, pattern, negated=False, dir_only=False, anchored=False, source=None):
+        self.pattern = pattern
+        self.negated = negated
+        self.dir_only = dir_only
+        self.anchored = anchored
+        self.source = source
+
+    @classmethod
+    def parse(cls, line, source=None):
+        """
+        Parses one line of a .gitignore file.
+
+        Returns:
+            Rule: The rule, or None for blank lines and comments.
+        """
+        line = line.rstrip('\n').rstrip('\r')
+        stripped = line.rstrip(' \t')
+        if stripped.endswith('\\') and len(line) > len(stripped):
+            stripped += ' '
+        line = stripped
+        if not line or line.startswith('#'):
+            return None
+        negated = line.startswith('!')
+        if negated or line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if line.startswith('**/') and '/' not in line[3:]:
+            line = line[3:]
+        anchored = '/' in line
+        line = line.lstrip('/')
+        if not line:
+            return None
+        return cls(line, negated, dir_only, anchored, source)
+
+    @property
+    def key(self):
+        """
+        Identifies the rule by what it matches, ignoring the template it came from.
+        """
+        return (self.pattern, self.negated, self.dir_only, self.anchored)
+
+    def covers(self, other, through_parents=True):
+        """
+        Conservatively checks that every path `other` matches is ignored
+        once this rule matches, i.e. that `other` is redundant next to it.
+
+        With `through_parents` False, a literal path only counts as covered
+        if this rule matches the path itself, not one of its parent
+        directories, which a later negation could re-include.
+        """
+        if self.negated or other.negated:
+            return False
+        if self.pattern == other.pattern and self.anchored == other.anchored:
+            return other.dir_only or not self.dir_only
+        if other.anchored:
+            if has_wildcards(other.pattern):
+                return False
+            # A literal path is ignored if this rule ignores one of its parent
+            # directories, or the path itself.
+            segments = other.pattern.split('/')
+            for depth in range(1 if through_parents else len(segments), len(segments) + 1):
+                if depth == len(segments) and self.dir_only and not other.dir_only:
+                    break
+                target = '/'.join(segments[:depth]) if self.anchored else segments[depth - 1]
+                if compile_pattern(self.pattern)(target):
+                    return True
+            return False
+        if self.anchored or (self.dir_only and not other.dir_only):
+            return False
+        if not has_wildcards(other.pattern):
+            return compile_pattern(self.pattern)(other.pattern) is not None
+        suffix, other_suffix = self.pattern[1:], other.pattern[1:]
+        return (self.pattern.startswith('*') and other.pattern.startswith('*') and not has_wildcards(suffix)
+                and not has_wildcards(other_suffix) and other_suffix.endswith(suffix))
+
+    def render(self):
+        """
+        Renders the rule as a .gitignore line that parses back to the same rule.
+        """
+        text = self.pattern
+        if self.anchored and '/' not in text:
+            text = '/' + text
+        if text.startswith(('!', '#')):
+            text = '\\' + text
+        return f"{'!' if self.negated else ''}{text}{'/' if self.dir_only else ''}"
+
+    def __repr__(self):
+        return f"Rule({self.render()!r})"
+
+
+def parse_rules(text, source=None):
+    """
+    Parses .gitignore text into a list of rules, in file order.
+    """
+    return [rule for rule in (Rule.parse(line, source) for line in text.splitlines()) if rule is not None]
+
+
+def minimize_rules(rules):
+    """
+    Removes duplicate and shadowed rules without changing what is ignored.
+
+    A rule is dropped if an identical or broader rule follows it (the later
+    rule would decide every path anyway), or if a broader rule precedes it
+    and no negation comes after that broader rule. A following rule that
+    only covers through a parent directory counts as broader only if no
+    negation comes after it either, since that negation could re-include the
+    directory and hand the path back to the dropped rule.
+
+    Args:
+        rules (list): Rules in file order.
+
+    Returns:
+        list: The remaining rules, in their original relative order.
+    """
+    last_index = {rule.key: index for index, rule in enumerate(rules)}
+    rules = [rule for index, rule in enumerate(rules) if last_index[rule.key] == index]
+    last_negation = max((index for index, rule in enumerate(rules) if rule.negated), default=-1)
+    # Candidate covering rules are looked up through the matcher's index
+    # instead of comparing every pair of rules.
+    index = GitignoreMatcher(rules)
+    same_pattern = {}
+    for position, rule in enumerate(rules):
+        same_pattern.setdefault((rule.pattern, rule.anchored), []).append((position, rule))
+    kept = []
+    for position, rule in enumerate(rules):
+        if rule.negated or not _is_shadowed(position, rule, index, same_pattern, last_negation):
+            kept.append(rule)
+    return kept
+
+
+def _covering_candidates(rule, index, same_pattern):
+    yield from same_pattern[(rule.pattern, rule.anchored)]
+    pattern = rule.pattern
+    if rule.anchored:
+        if not has_wildcards(pattern):
+            segments = pattern.split('/')
+            for depth in range(1, len(segments) + 1):
+                yield from index.candidates(segments[depth - 1], '/'.join(segments[:depth]))
+    elif not has_wildcards(pattern):
+        yield from index.candidates(pattern, pattern)
+    elif pattern.startswith('*') and not has_wildcards(pattern[1:]):
+        for length in index.suffix_lengths:
+            if length < len(pattern):
+                yield from index.suffixes.get(pattern[len(pattern) - length:], ())
+
+
+def _is_shadowed(position, rule, index, same_pattern, last_negation):
+    for other_position, other in _covering_candidates(rule, index, same_pattern):
+        if other_position == position or not other.covers(rule):
+            continue
+        if other_position > position:
+            if last_negation < other_position or other.covers(rule, through_parents=False):
+                return True
+            continue
+        if last_negation < other_position:
+            # Of two equivalent rules, only the earlier one is dropped.
+            if rule.covers(other) and last_negation < position:
+                continue
+            return True
+    return False
+
+
+def compile_gitignore(templates):
+    """
+    Merges .gitignore templates into one minimal file.
+
+    Args:
+        templates (iterable): (name, text) pairs, in precedence order.
+
+    Returns:
+        str: The merged rules, grouped under a comment naming the template
+        each rule came from.
+    """
+    rules = []
+    for name, text in templates:
+        rules.extend(parse_rules(text, source=name))
+    lines = []
+    source = object()
+    for rule in minimize_rules(rules):
+        if rule.source != source:
+            source = rule.source
+            if lines:
+                lines.append('')
+            lines.append(f'# {source}')
+        lines.append(rule.render())
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+class GitignoreMatcher:
+    """
+    An index of .gitignore rules for fast path matching.
+    """
+
+    def __init__(self, rules):
+        """
+        Initializes a new instance of the GitignoreMatcher class.
+
+        Args:
+            rules (list): Rules in file order.
+        """
+        self.rules = list(rules)
+        self.has_negations = any(rule.negated for rule in self.rules)
+        self.names = {}
+        self.suffixes = {}
+        self.prefixes = {}
+        self.patterns = []
+        self.paths = []
+        for index, rule in enumerate(self.rules):
+            entry = (index, rule)
+            pattern = rule.pattern
+            if rule.anchored:
+                self.paths.append((index, rule, compile_pattern(pattern)))
+            elif not has_wildcards(pattern):
+                self.names.setdefault(pattern, []).append(entry)
+            elif pattern.startswith('*') and not has_wildcards(pattern[1:]):
+                self.suffixes.setdefault(pattern[1:], []).append(entry)
+            elif pattern.endswith('*') and not has_wildcards(pattern[:-1]):
+                self.prefixes.setdefault(pattern[:-1], []).append(entry)
+            else:
+                self.patterns.append((index, rule, compile_pattern(pattern)))
+        self.suffix_lengths = sorted({len(suffix) for suffix in self.suffixes})
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefixes})
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Builds a matcher from .gitignore text.
+        """
+        return cls(parse_rules(text))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Builds a matcher from a .gitignore file; a missing file ignores nothing.
+
+        Content staged in the active FileEmitter takes precedence over disk.
+        Matchers are shared between files with identical content, so a batch
+        of projects with the same .gitignore compiles it once.
+        """
+        try:
+            text = read_file(path)
+        except (OSError, UnicodeDecodeError):
+            text = None
+        return _matcher_for_text(text or '')
+
+    def candidates(self, name, rel_path):
+        """
+        Yields the (index, rule) pairs whose pattern matches the name or path,
+        before the directory-only and precedence checks.
+        """
+        yield from self.names.get(name, ())
+        for length in self.suffix_lengths:
+            if length > len(name):
+                break
+            yield from self.suffixes.get(name[-length:] if length else '', ())
+        for length in self.prefix_lengths:
+            if length > len(name):
+                break
+            yield from self.prefixes.get(name[:length], ())
+        for index, rule, fullmatch in self.patterns:
+            if fullmatch(name):
+                yield index, rule
+        for index, rule, fullmatch in self.paths:
+            if fullmatch(rel_path):
+                yield index, rule
+
+    def is_ignored(self, rel_path, is_dir=False):
+        """
+        Checks a path relative to the .gitignore's directory.
+
+        Only the path itself is matched; callers walking a tree skip ignored
+        directories rather than asking about their contents.
+
+        Args:
+            rel_path (str): A '/'-separated path such as 'src/module.py'.
+            is_dir (bool): Whether the path is a directory.
+
+        Returns:
+            bool: True if the last matching rule ignores the path.
+        """
+        name = rel_path.rsplit('/', 1)[-1]
+        last_index, last_rule = -1, None
+        for index, rule in self.candidates(name, rel_path):
+            if rule.dir_only and not is_dir:
+                continue
+            if not self.has_negations:
+                return True
+            if index > last_index:
+                last_index, last_rule = index, rule
+        return last_rule is not None and not last_rule.negated
+
+    def __bool__(self):
+        return bool(self.rules)
+
+
+@functools.lru_cache(maxsize=32)
+def _matcher_for_text(text):
+    return GitignoreMatcher.from_text(text)
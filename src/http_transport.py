@@ -0,0 +1,96 @@
+"""http_transport.py
+A shared, pooled HTTP transport for all remote template fetches.
+
+This module provides the `HTTPTransport` class, a thin wrapper around one
+`requests.Session` whose adapter keeps connections alive in a pool, retries
+idempotent requests with exponential backoff (honouring Retry-After on 429
+and 503 responses) and applies a connect/read timeout to every request.
+`default_transport()` returns a process-wide instance so the template cache,
+the gitignore generator and the license fetcher all reuse one pool.
+
+Ex. Usage:
+transport = default_transport()
+response = transport.get('https://raw.githubusercontent.com/github/gitignore/main/Python.gitignore')
+"""
+
+import threading
+
+DEFAULT_TIMEOUT = (5, 30)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_default = None
+_default_lock = threading.Lock()
+
+
+class HTTPTransport:
+    """
+    A keep-alive connection pool with retries and per-request timeouts.
+    """
+
+    def __init__(self, pool_size=16, retries=3, backoff_factor=0.5, timeout=DEFAULT_TIMEOUT):
+        """
+        Initializes a new instance of the HTTPTransport class.
+
+        Args:
+            pool_size (int): Connections kept alive per host.
+            retries (int): Retries for connection errors and retryable statuses.
+            backoff_factor (float): Base of the exponential backoff, in seconds.
+            timeout (tuple): (connect, read) timeout applied to every request.
+        """
+        # Imported here so that commands which never touch the network do
+        # not pay for loading requests and urllib3.
+        import requests  # pylint: disable=import-outside-toplevel
+        from requests.adapters import HTTPAdapter  # pylint: disable=import-outside-toplevel
+        from urllib3.util.retry import Retry  # pylint: disable=import-outside-toplevel
+
+        self.timeout = timeout
+        self.request_exception = requests.RequestException
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, headers=None, timeout=None):
+        """
+        Sends a GET request through the pooled session.
+
+        Args:
+            url (str): The URL to fetch.
+            headers (dict): Extra request headers.
+            timeout (float or tuple): Overrides the transport timeout.
+
+        Returns:
+            requests.Response: The final response after retries.
+
+        Raises:
+            requests.RequestException: If the request could not be completed.
+        """
+        return self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+
+    def close(self):
+        """
+        Closes every pooled connection.
+        """
+        self.session.close()
+
+
+def default_transport():
+    """
+    Returns the process-wide shared transport, creating it on first use.
+
+    Returns:
+        HTTPTransport: The shared transport.
+    """
+    global _default  # pylint: disable=global-statement
+    with _default_lock:
+        if _default is None:
+            _default = HTTPTransport()
+        return _default
@@ -0,0 +1,126 @@
+"""journal.py
+An append-only checkpoint journal for resumable batch runs.
+
+This module provides the `BatchJournal` class. A batch records the outcome
+of every (project, step) pair as one JSON line, appended and flushed to disk
+as soon as the step's effects are durable. Each record carries a fingerprint
+of the step's inputs, so a resumed run skips exactly the pairs that completed
+with the same inputs and redoes failed, unfinished or outdated ones. A line
+torn by a crash mid-write is cut off on load, so that later appends start on
+a line of their own.
+
+Ex. Usage:
+journal = BatchJournal('projects/.scaffold-journal.jsonl', resume=True)
+if not journal.is_done('projects/demo', 'files', digest):
+    ...
+    journal.record('projects/demo', 'files', 'done', digest)
+"""
+
+import json
+import os
+import threading
+import time
+
+JOURNAL_FILE = '.scaffold-journal.jsonl'
+
+
+class BatchJournal:
+    """
+    A durable log of completed and failed (project, step) pairs.
+    """
+
+    def __init__(self, path, resume=False):
+        """
+        Initializes a new instance of the BatchJournal class.
+
+        Args:
+            path (str): The JSON-lines journal file.
+            resume (bool): Load the existing journal; otherwise it is started
+            afresh and every step is considered unfinished.
+        """
+        self.path = path
+        self.resume = resume
+        self.entries = {}
+        self._lock = threading.Lock()
+        if resume:
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, mode='w', encoding='utf-8'):
+                pass
+
+    def _load(self):
+        try:
+            with open(self.path, mode='rb+') as file:
+                data = file.read()
+                complete = data.rfind(b'\n') + 1
+                if complete < len(data):
+                    # A torn last line would swallow the next record appended to it.
+                    file.truncate(complete)
+                    file.flush()
+                    os.fsync(file.fileno())
+        except FileNotFoundError:
+            return
+        for line in data[:complete].decode('utf-8', errors='replace').splitlines():
+            try:
+                entry = json.loads(line)
+                self.entries[(entry['project'], entry['step'])] = entry
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def status(self, project, step):
+        """
+        Returns the last recorded status of a pair, or None if never recorded.
+        """
+        entry = self.entries.get((project, step))
+        return entry['status'] if entry is not None else None
+
+    def is_done(self, project, step, digest=None):
+        """
+        Checks whether a pair completed, with the same inputs if `digest` is given.
+        """
+        entry = self.entries.get((project, step))
+        return (entry is not None and entry['status'] == 'done'
+                and (digest is None or entry.get('digest') == digest))
+
+    def record(self, project, step, status, digest=None, error=None):
+        """
+        Appends one record and forces it to disk.
+
+        Args:
+            project (str): The project directory.
+            step (str): The step name.
+            status (str): 'done' or 'failed'.
+            digest (str): The fingerprint of the step's inputs.
+            error (str): The failure message, for failed steps.
+        """
+        self.record_many([(project, step, status, digest, error)])
+
+    def record_many(self, records):
+        """
+        Appends several records with a single write and fsync.
+
+        Args:
+            records (iterable): (project, step, status, digest, error) tuples.
+        """
+        now = time.time()
+        entries = [
+            {'project': project, 'step': step, 'status': status, 'digest': digest, 'error': error, 'time': now}
+            for project, step, status, digest, error in records
+        ]
+        if not entries:
+            return
+        data = ''.join(json.dumps(entry, sort_keys=True) + '\n' for entry in entries)
+        with self._lock:
+            with open(self.path, mode='a', encoding='utf-8') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            for entry in entries:
+                self.entries[(entry['project'], entry['step'])] = entry
+
+    def failures(self):
+        """
+        Returns the failed pairs as {(project, step): error}.
+        """
+        return {key: entry.get('error') for key, entry in self.entries.items() if entry['status'] == 'failed'}
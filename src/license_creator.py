@@ -1,31 +1,100 @@
-import requests
+"""license_creator.py
+A class for creating a project's LICENSE file.
+
+The LicenseCreator class looks up the license named by the `License` key of
+the [Settings] section, first in the offline template bundle and otherwise on
+choosealicense.com through the shared template cache, applies the LICENSE
+template of the [Templates] directory if there is one, and writes the result
+to the project directory.
+
+Ex. Usage:
+creator = LicenseCreator(load_settings('config/conf.ini'))
+creator.create_license()
+"""
+
+import os
+import time
+from src.build_state import write_if_changed
+from src.instrumentation import recorder, timed
+from src.template_bundle import default_bundle
+from src.settings import resolve_settings
+from src.template_cache import TemplateCache
+from src.templating import find_template
+
+LICENSE_BASE_URL = 'https://raw.githubusercontent.com/github/choosealicense.com/gh-pages/_licenses'
+
 
 class LicenseCreator:
-    def __init__(self, config):
-        self.config = config
+    """
+    A class to fetch, render and write the license selected in the config file.
+    """
+    def __init__(self, config, cache=None, base_url=LICENSE_BASE_URL, project_dir='.', bundle=None,
+                 template=None):
+        self.config = resolve_settings(config)
+        self.project_dir = project_dir
+        self.cache = cache if cache is not None else TemplateCache()
+        self.base_url = base_url.rstrip('/')
+        self.bundle = default_bundle() if bundle is None else bundle
+        self.template = template if template is not None else find_template(self.config, 'LICENSE')
+
+    def license_url(self):
+        """
+        Returns the URL of the license specified in the config file.
+        """
+        license_name = self.config['Settings']['License']
+        return f'{self.base_url}/{license_name.lower()}.txt'
+
+    @timed('LicenseCreator')
+    def fetch_license(self):
+        """
+        Fetches the text of the license specified in the config file.
+
+        The offline template bundle is consulted first; the network is only
+        used for licenses it does not contain.
+
+        Returns:
+            str: The license text, or None if it could not be fetched.
+        """
+        if self.bundle:
+            text = self.bundle.get('license', self.config['Settings']['License'])
+            if text is not None:
+                return text
+        return self.cache.get(self.license_url())
+
+    def render_license(self):
+        """
+        Fetches the license text and applies the LICENSE template, if any.
+
+        The template is rendered with `license` (the fetched text), `year`,
+        `name` and `author` (from [Metadata]), e.g. to add a copyright header.
 
+        Returns:
+            str: The LICENSE contents, or None if the license could not be fetched.
+        """
+        text = self.fetch_license()
+        if text is None or self.template is None:
+            return text
+        metadata = self.config['Metadata'] if 'Metadata' in self.config else {}
+        return self.template.render({
+            'license': text,
+            'year': time.localtime().tm_year,
+            'name': metadata.get('name'),
+            'author': metadata.get('authors'),
+        })
+
+    @timed('LicenseCreator')
     def create_license(self):
         """
         Fetches and creates a LICENSE file based on the license specified in the config file.
 
-        Sends an HTTP request to fetch the text of the specified license from
-        'https://choosealicense.com', and writes the license text to a LICENSE
-        file in the project directory.
+        Fetches the text of the specified license from the choosealicense.com
+        repository through the shared template cache, and writes the license
+        text to a LICENSE file in the project directory.
         """
-        license_name = self.config['Settings']['License']
-        # Update the URL to fetch the raw text of the license
-        url = f'https://raw.githubusercontent.com/github/choosealicense.com/gh-pages/_licenses/{license_name.lower()}.txt'
-        response = requests.get(url, timeout=30)
-        if response.status_code == 200:
-            with open(file='LICENSE', mode='w', encoding='utf-8') as file:
-                file.write(response.text)  # Corrected attribute access to response.text
+        text = self.render_license()
+        if text is not None:
+            write_if_changed(os.path.join(self.project_dir, 'LICENSE'), text)
         else:
-            print(f'Failed to fetch license. HTTP Status Code: {response.status_code}')
-
-# Example usage:
-config = {
-    'Settings': {
-        'License': 'MIT'
-    }
-}
-# license_creator = LicenseCreator(config)
+            print(f"Failed to fetch license {self.config['Settings']['License']}.")
+            recorder.event('LicenseCreator', 'license unavailable',
+                           license=self.config['Settings']['License'])
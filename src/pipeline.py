@@ -0,0 +1,211 @@
+"""pipeline.py
+A dependency-aware, asynchronous scheduler for scaffolding steps.
+
+This module provides the `Step` and `Pipeline` classes. Each step declares the
+files it reads (inputs) and the files it produces (outputs); a step depends on
+every other step that produces one of its inputs, and inputs nobody produces
+(such as `config/conf.ini`) are treated as already present. The pipeline runs
+each step in a worker thread as soon as all of its dependencies have finished,
+so independent I/O and subprocess waits overlap and the total run time
+approaches the length of the critical path. Given a `BuildState`, steps that
+declare a fingerprint are skipped when neither it nor the content of their
+pipeline-produced inputs changed since the last run.
+
+Ex. Usage:
+pipeline = Pipeline([
+    Step('requirements', setup.create_requirements, outputs=['requirements.txt']),
+    Step('license', creator.create_license, outputs=['LICENSE']),
+    Step('readme', readme.generate_readme, inputs=['LICENSE', 'requirements.txt'], outputs=['README.md']),
+])
+results = pipeline.run()
+"""
+
+import asyncio
+import os
+import time
+from graphlib import CycleError, TopologicalSorter
+
+from src.build_state import file_digest, fingerprint
+from src.instrumentation import recorder
+
+
+class Step:
+    """
+    A single unit of scaffolding work with declared inputs and outputs.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), fingerprint_func=None):
+        """
+        Initializes a new instance of the Step class.
+
+        Args:
+            name (str): A unique name for the step.
+            func (callable): A blocking callable taking no arguments.
+            inputs (iterable): Paths the step reads.
+            outputs (iterable): Paths the step writes.
+            fingerprint_func (callable): Returns a JSON-serializable value that
+            captures every external input of the step (config sections,
+            template content, tool versions). Steps without one always run.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.fingerprint = fingerprint_func
+
+    def __repr__(self):
+        return f"Step({self.name!r})"
+
+
+class StepResult:
+    """
+    The outcome of running a step: 'ok', 'unchanged', 'failed' or 'skipped'.
+    """
+
+    def __init__(self, name, status, duration=0.0, error=None):
+        self.name = name
+        self.status = status
+        self.duration = duration
+        self.error = error
+
+    def __repr__(self):
+        return f"StepResult({self.name!r}, {self.status!r}, {self.duration:.3f}s)"
+
+
+class Pipeline:
+    """
+    A DAG of steps executed concurrently by an asyncio scheduler.
+
+    If a step raises, every step that transitively depends on it is skipped,
+    while unrelated branches keep running.
+    """
+
+    def __init__(self, steps):
+        """
+        Initializes a new instance of the Pipeline class.
+
+        Args:
+            steps (list): The steps to schedule.
+
+        Raises:
+            ValueError: If two steps share a name or an output, or if the
+            declared inputs and outputs form a cycle.
+        """
+        self.steps = {}
+        producers = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate step name: {step.name}")
+            self.steps[step.name] = step
+            for output in step.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} is produced by both {producers[output]} and {step.name}")
+                producers[output] = step.name
+        self.producers = producers
+        self.dependencies = {
+            step.name: {producers[path] for path in step.inputs if path in producers} - {step.name}
+            for step in steps
+        }
+        try:
+            self.order = list(TopologicalSorter(self.dependencies).static_order())
+        except CycleError as err:
+            raise ValueError(f"Steps form a cycle: {err.args[1]}") from err
+
+    def affected(self, paths):
+        """
+        Finds the steps to rerun after some files changed.
+
+        A step is affected if one of `paths` is one of its inputs or lies
+        under an input directory ('.' stands for the whole project), and so
+        is every step that transitively depends on an affected step.
+
+        Args:
+            paths (iterable): Changed paths, relative to the project.
+
+        Returns:
+            set: The names of the affected steps.
+        """
+        paths = {os.path.normpath(path) for path in paths}
+        affected = set()
+        for step in self.steps.values():
+            for declared in map(os.path.normpath, step.inputs):
+                prefix = '' if declared == '.' else declared + os.sep
+                if declared in paths or any(path.startswith(prefix) for path in paths):
+                    affected.add(step.name)
+                    break
+        for name in self.order:
+            if self.dependencies[name] & affected:
+                affected.add(name)
+        return affected
+
+    def subset(self, names):
+        """
+        Returns a Pipeline of only the named steps; outputs of the others are taken as present.
+        """
+        return Pipeline([step for name, step in self.steps.items() if name in names])
+
+    def _digest(self, step, state):
+        produced = sorted(path for path in step.inputs if path in self.producers)
+        return fingerprint(
+            step.fingerprint(),
+            [(path, file_digest(os.path.join(state.project_dir, path))) for path in produced],
+        )
+
+    async def _run_step(self, step, done, results, state):
+        for dependency in self.dependencies[step.name]:
+            await done[dependency].wait()
+        failed = [d for d in self.dependencies[step.name] if results[d].status not in ('ok', 'unchanged')]
+        if failed:
+            results[step.name] = StepResult(step.name, 'skipped', error=f"dependency failed: {', '.join(sorted(failed))}")
+            done[step.name].set()
+            return
+        start = time.perf_counter()
+        try:
+            digest = None
+            if state is not None and step.fingerprint is not None:
+                digest = await asyncio.to_thread(self._digest, step, state)
+                if state.is_current(step.name, digest, step.outputs):
+                    results[step.name] = StepResult(step.name, 'unchanged', time.perf_counter() - start)
+                    return
+            if recorder.enabled:
+                await asyncio.to_thread(recorder.call, 'Pipeline', step.name, step.func)
+            else:
+                await asyncio.to_thread(step.func)
+            if digest is not None:
+                state.record(step.name, digest)
+            results[step.name] = StepResult(step.name, 'ok', time.perf_counter() - start)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            results[step.name] = StepResult(step.name, 'failed', time.perf_counter() - start, err)
+            recorder.event('Pipeline', 'step failed', step=step.name, error=str(err))
+        finally:
+            done[step.name].set()
+
+    async def run_async(self, state=None):
+        """
+        Runs every step, starting each as soon as its dependencies finish.
+
+        Args:
+            state (BuildState): If given, skip steps whose fingerprint is
+            unchanged, and record and save the fingerprints of steps that ran.
+
+        Returns:
+            dict: Mapping of step names to StepResult, in topological order.
+        """
+        done = {name: asyncio.Event() for name in self.steps}
+        results = {}
+        await asyncio.gather(*(self._run_step(self.steps[name], done, results, state) for name in self.order))
+        if state is not None:
+            state.save()
+        return {name: results[name] for name in self.order}
+
+    def run(self, state=None):
+        """
+        Runs the pipeline to completion from synchronous code.
+
+        Args:
+            state (BuildState): Optional build manifest, see `run_async`.
+
+        Returns:
+            dict: Mapping of step names to StepResult, in topological order.
+        """
+        return asyncio.run(self.run_async(state))
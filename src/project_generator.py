@@ -10,12 +10,20 @@ to further configure or setup the project environment.
 # Ex. Usage:
 # generator = Generator()
 # generator.generate_gitignore(['Python', 'Node'])
-# generator.execute_script('scripts/*')
+# generator.execute_script('scripts/backups/*.sh')
 """
 
 import os
-import subprocess
-import requests
+from src.build_state import write_if_changed
+from src.gitignore import compile_gitignore
+from src.instrumentation import recorder, timed
+from src.script_runner import ScriptRunner
+from src.template_bundle import default_bundle
+from src.template_cache import TemplateCache
+
+GITIGNORE_BASE_URL = "https://raw.githubusercontent.com/github/gitignore/main"
+# Seconds after which a setup script is killed, unless [Scripts] timeout says otherwise.
+SCRIPT_TIMEOUT = 600
 
 
 class ProjectGenerator:
@@ -28,7 +36,8 @@ class ProjectGenerator:
     management of a project repository.
     """
 
-    def __init__(self, templates_dir="gitignore_templates"):
+    def __init__(self, templates_dir="gitignore_templates", cache=None, base_url=GITIGNORE_BASE_URL,
+                 project_dir=".", bundle=None):
         """
         Initializes a new instance of the ProjectGenerator class.
 
@@ -38,65 +47,134 @@ class ProjectGenerator:
         Args:
             templates_dir (str): The path of the directory where .gitignore
             templates will be stored.
+            cache (TemplateCache): The shared template cache to fetch through.
+            A default on-disk cache is used if omitted.
+            base_url (str): The URL templates are fetched from.
+            project_dir (str): The directory the .gitignore file is written to.
+            bundle (TemplateBundle): The offline template pack consulted
+            before the network; defaults to the shared bundle if one is
+            installed. Pass False to always fetch remotely.
         """
         self.templates_dir = templates_dir
-        if not os.path.exists(templates_dir):
-            os.mkdir(templates_dir)
+        self.cache = cache if cache is not None else TemplateCache()
+        self.base_url = base_url.rstrip("/")
+        self.project_dir = project_dir
+        self.bundle = default_bundle() if bundle is None else bundle
+        self._rendered = {}
+        os.makedirs(templates_dir, exist_ok=True)
+
+    def template_url(self, template_name):
+        """
+        Returns the URL of a .gitignore template.
+        """
+        return f"{self.base_url}/{template_name}.gitignore"
 
+    @timed('ProjectGenerator')
     def fetch_template(self, template_name):
         """
         Fetches a .gitignore template from a remote repository.
 
-        This method sends an HTTP request to fetch a specified .gitignore
-        template from GitHub's collection of .gitignore templates, and saves
-        the template to a local file.
+        This method returns the template from the offline template bundle
+        when it is there. Otherwise it fetches the template from GitHub's
+        collection of .gitignore templates through the shared template cache,
+        which revalidates stale copies, and saves the template to a local file.
 
         Args:
             template_name (str): The name of the .gitignore template to fetch.
+
+        Returns:
+            str: The template text, or None if it could not be fetched.
+        """
+        if self.bundle:
+            text = self.bundle.get("gitignore", template_name)
+            if text is not None:
+                return text
+        text = self.cache.get(self.template_url(template_name))
+        if text is None:
+            print(f"Failed to fetch {template_name} template.")
+            recorder.event('ProjectGenerator', 'template unavailable', template=template_name)
+            return None
+        with open(f"{self.templates_dir}/{template_name}.gitignore", mode="w", encoding='utf-8') as file:
+            file.write(text)
+        return text
+
+    @timed('ProjectGenerator')
+    def render_gitignore(self, template_names):
         """
-        url = f"https://raw.githubusercontent.com/github/gitignore/main/{template_name}.gitignore"
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(f"{self.templates_dir}/{template_name}.gitignore", mode="w", encoding='utf-8') as file:
-                file.write(response.text)
-        else:
-            print(
-                f"Failed to fetch {template_name} template. HTTP Status Code: {response.status_code}"
-            )
+        Builds the contents of a .gitignore file from specified templates.
+
+        This method compiles the specified templates into one minimal set of
+        rules, without duplicates or rules shadowed by broader ones, without
+        touching the project directory. All templates are prefetched
+        concurrently through the template cache before any is assembled, and
+        the result is memoized, so the fingerprint check and the write of one
+        run share a single render.
 
+        Args:
+            template_names (list): A list of template names to be used for generating the .gitignore file.
+
+        Returns:
+            str: The compiled .gitignore contents.
+        """
+        key = tuple(template_names)
+        text = self._rendered.get(key)
+        if text is not None:
+            return text
+        self.cache.prefetch(
+            self.template_url(name) for name in template_names
+            if not (self.bundle and ("gitignore", name) in self.bundle)
+        )
+        templates = []
+        for template_name in template_names:
+            template = self.fetch_template(template_name)
+            if template is not None:
+                templates.append((template_name, template))
+        text = compile_gitignore(templates)
+        if len(templates) == len(template_names):
+            self._rendered[key] = text
+        return text
+
+    @timed('ProjectGenerator')
     def generate_gitignore(self, template_names):
         """
         Generates a .gitignore file based on specified templates.
 
-        This method creates a .gitignore file for the project by concatenating
-        the contents of the specified template files. If a template is not found
-        locally, it fetches the template from a remote repository.
+        This method creates a .gitignore file for the project by compiling
+        the specified template files, fetched through the template cache,
+        into a minimal, deduplicated set of rules.
 
         Args:
             template_names (list): A list of template names to be used for generating the .gitignore file.
         """
-        with open(file=".gitignore", mode="w", encoding="utf-8") as gitignore_file:
-            for template_name in template_names:
-                template_path = f"{self.templates_dir}/{template_name}.gitignore"
-                if not os.path.exists(template_path):
-                    self.fetch_template(template_name)
-                with open(file=template_path, mode="r", encoding='utf-8') as template_file:
-                    gitignore_file.write(template_file.read())
-                    gitignore_file.write("\n")
-
-    def execute_script(self, script_path):
+        write_if_changed(os.path.join(self.project_dir, ".gitignore"), self.render_gitignore(template_names))
+
+    @timed('ProjectGenerator')
+    def execute_script(self, script_path, max_workers=4, timeout=SCRIPT_TIMEOUT):
         """
-        Executes a specified script using the bash shell.
+        Executes the scripts matching a path or glob using the bash shell.
 
-        This method runs the specified script file in a bash shell, capturing
-        and displaying the output. It is useful for executing setup scripts or
-        other bash scripts required for project configuration.
+        This method expands `script_path` (e.g. 'scripts/backups/*.sh') and
+        runs the matching scripts concurrently through a ScriptRunner, which
+        streams each line of output prefixed with the script name. It is
+        useful for executing setup scripts or other bash scripts required for
+        project configuration.
 
         Args:
-            script_path (str): The path to the script to be executed.
+            script_path (str): The path or glob pattern of the scripts to be executed.
+            max_workers (int): The maximum number of scripts run at once.
+            timeout (float): Seconds after which a script is killed; None for no limit.
+
+        Returns:
+            list: A ScriptResult with exit code and duration per script.
         """
-        result = subprocess.run(["bash", script_path], capture_output=True, text=True, check=True)
-        if result.returncode == 0:
-            print(f"Success: {result.stdout}")
-        else:
-            print(f"Error: {result.stderr}")
+        results = ScriptRunner(max_workers=max_workers, timeout=timeout, cwd=self.project_dir).run(script_path)
+        if not results:
+            print(f"Error: no scripts match {script_path}")
+        for result in results:
+            if result.ok:
+                print(f"Success: {result.name} ({result.duration:.2f}s)")
+            else:
+                reason = "timed out" if result.timed_out else f"exit code {result.returncode}"
+                print(f"Error: {result.name} failed with {reason} ({result.duration:.2f}s)")
+                recorder.event('ProjectGenerator', 'script failed', script=result.name, reason=reason)
+        return results
@@ -5,8 +5,12 @@ files.
 This script provides a class `ProjectSetup` that automates the creation of key
 project files such as `requirements.txt`, a virtual environment, `.pylintrc`,
 and `LICENSE`, based on configurations specified in a `config.ini` file. It
-also provides a method to execute a git setup script, facilitating a
-streamlined setup process for new projects.
+also initializes the project's git repository in-process, facilitating a
+streamlined setup process for new projects; pushing is left to a separate,
+deferred phase (see `src.git_repository.push_repositories`). When the
+[Resolver] section names a local package-index directory, dependencies are
+resolved against it and pinned, and a hashed requirements.lock is written
+next to requirements.txt (see `src.resolver`).
 
 Ex. Usage:
 setup = ProjectSetup()
@@ -18,9 +22,17 @@ setup.execute_git_setup()
 """
 
 import os
-import configparser
-import subprocess
-import requests
+from src.build_state import write_if_changed
+from src.git_repository import GitIdentity, initialize_repository
+from src.instrumentation import run_subprocess, timed
+from src.pylintrc_provider import PylintrcProvider, pylint_overrides
+from src.settings import DEFAULT_CONFIG_PATH, load_settings
+
+LOCK_FILE = 'requirements.lock'
+
+# The generated files that make up a project's first commit.
+GIT_TRACKED_FILES = ('README.md', 'requirements.txt', LOCK_FILE, 'pyproject.toml', '.gitignore', 'LICENSE',
+                     '.pylintrc')
 
 class ProjectSetup:
     """
@@ -29,42 +41,143 @@ class ProjectSetup:
     The class reads configurations from a specified `config.ini` file and
     provides methods to create a `requirements.txt` file, a virtual
     environment, a `.pylintrc` file, and a `LICENSE` file. It also provides a
-    method to execute a git setup script.
+    method to initialize the project's git repository.
     """
-    def __init__(self, config_path='config/conf.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_path)
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH, project_dir='.', provisioner=None, pylintrc_provider=None):
+        self.config = load_settings(config_path)
+        self.project_dir = project_dir
+        self.provisioner = provisioner
+        self.pylintrc_provider = pylintrc_provider if pylintrc_provider is not None else PylintrcProvider()
+        self._resolution = None
+
+    def package_index(self):
+        """
+        Returns the PackageIndex of the [Resolver] `index` directory, or None if none is configured.
+        """
+        directory = self.config.get('Resolver', 'index')
+        if not directory:
+            return None
+        from src.resolver import PackageIndex  # pylint: disable=import-outside-toplevel
+        return PackageIndex(directory)
+
+    def resolve_dependencies(self):
+        """
+        Resolves the [Dependencies] section against the configured package index.
+
+        The target Python defaults to the running interpreter and can be set
+        with the [Resolver] `python` key.
+
+        Returns:
+            Resolution: The pinned dependencies, or None without a package index.
+
+        Raises:
+            DependencyError: If an entry is invalid or cannot be satisfied.
+        """
+        if self._resolution is None:
+            index = self.package_index()
+            if index is None:
+                return None
+            # Imported here so that only resolving and rendering pay for loading packaging.
+            from src.resolver import Resolver, parse_dependencies  # pylint: disable=import-outside-toplevel
+
+            python_spec, requirements = parse_dependencies(self.config.dependencies)
+            resolver = Resolver(index, python_version=self.config.get('Resolver', 'python'))
+            self._resolution = resolver.resolve(requirements, python_spec)
+        return self._resolution
+
+    def render_requirements(self):
+        """
+        Builds the contents of requirements.txt from the config file.
+
+        Returns:
+            str: One requirement per package of the [Dependencies] section,
+            pinned to its resolved version when a package index is configured.
+            The `python` constraint belongs to pyproject.toml and is left out.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from src.resolver import parse_dependencies, render_pinned_requirements
+
+        resolution = self.resolve_dependencies()
+        if resolution is not None:
+            return render_pinned_requirements(resolution)
+        _, requirements = parse_dependencies(self.config.dependencies)
+        return ''.join(f'{requirement}\n' for requirement in requirements)
+
+    def render_lockfile(self):
+        """
+        Builds the contents of requirements.lock.
+
+        Returns:
+            str: Every transitive dependency pinned with its hash, or None
+            without a package index.
+        """
+        resolution = self.resolve_dependencies()
+        if resolution is None:
+            return None
+        from src.resolver import render_lockfile  # pylint: disable=import-outside-toplevel
+        return render_lockfile(resolution)
 
+    @timed('ProjectSetup')
     def create_requirements(self):
         """
         Creates a requirements.txt file from the dependencies listed in the config file.
 
         Reads the [Dependencies] section from the config file and writes each
         dependency and its specified version to a new line in the requirements.
-        txt file.
+        txt file, plus requirements.lock when a package index is configured.
         """
-        with open(file='requirements.txt', mode='w', encoding='utf-8') as file:
-            for item in self.config['Dependencies']:
-                file.write(f'{item}=={self.config["Dependencies"][item]}\n')
+        write_if_changed(os.path.join(self.project_dir, 'requirements.txt'), self.render_requirements())
+        lockfile = self.render_lockfile()
+        if lockfile is not None:
+            write_if_changed(os.path.join(self.project_dir, LOCK_FILE), lockfile)
 
-    def create_venv(self):
+    def dependency_names(self):
         """
-        Creates a virtual environment in the project directory.
+        Lists the packages named in the [Dependencies] section.
 
-        Executes the command to create a new virtual environment named 'venv'
-        in the project directory.
+        Returns:
+            list: Requirement strings for pip, pinned when a package index is
+            configured, without the `python` version constraint.
         """
-        subprocess.run(["python", "-m", "venv", ".venv"], check=True)
+        return self.render_requirements().splitlines()
+
+    @timed('ProjectSetup')
+    def create_venv(self, install_dependencies=False):
+        """
+        Creates a virtual environment in the project directory.
+
+        Executes the command to create a new virtual environment named '.venv'
+        in the project directory. If a VenvProvisioner was given, the
+        environment is instead materialized from a shared base environment.
 
+        Args:
+            install_dependencies (bool): Install the [Dependencies] packages;
+            only supported together with a provisioner.
+
+        Returns:
+            ProvisionReport: The provisioner report, or None for a cold create.
+        """
+        target = os.path.join(self.project_dir, ".venv")
+        if self.provisioner is None:
+            run_subprocess(["python", "-m", "venv", target], check=True)
+            return None
+        requirements = self.dependency_names() if install_dependencies else []
+        report = self.provisioner.materialize(target, requirements)
+        print(f"Provisioned {report}")
+        return report
+
+    @timed('ProjectSetup')
     def create_pylintrc(self):
         """
         Generates a .pylintrc configuration file using Pylint's default
         settings.
 
-        Executes the command to generate a .pylintrc file with Pylint's default
-        configuration settings.
+        The default settings come from a cache keyed by the installed pylint
+        version, so pylint is only run the first time a version is seen.
+        Options from `[pylint.<SECTION>]` config sections are merged in.
         """
-        subprocess.run(['pylint', '--generate-rcfile'], check=True, stdout=open(file='.pylintrc', mode='w', encoding='utf-8'))
+        text = self.pylintrc_provider.render(pylint_overrides(self.config))
+        write_if_changed(os.path.join(self.project_dir, '.pylintrc'), text)
 
     # def create_license(self):
     #     """
@@ -83,40 +196,49 @@ class ProjectSetup:
     #     else:
     #         print(f'Failed to fetch license. HTTP Status Code: {response.status_code}')
 
-    def execute_git_setup_shell(self):
+    def script_env(self):
         """
-        Executes a git setup shell script specified in the project's script directory.
-
-        Attempts to execute the 'setup_git.sh' script located in the 'scripts'
-        directory to perform git setup tasks.
+        Returns the environment for setup scripts, with every config value
+        exported (e.g. SPD_GIT_USERNAME) so the scripts need not parse conf.ini.
         """
-        try:
-            subprocess.check_call(["../scripts/setup_git.sh"])
-            print("Git setup (shell) completed successfully!")
-        except subprocess.CalledProcessError:
-            print("Error occurred while setting up git using shell script.")
+        return {**os.environ, **self.config.to_env()}
 
-    def execute_git_setup_powershell(self):
+    def git_remote_url(self, repo_name=None):
         """
-        Executes a git setup PowerShell script specified in the project's script directory.
+        Returns the `origin` URL for a repository.
+
+        The URL is `<remote_base>/<repo_name>.git`, where `remote_base` comes
+        from the [git] section (e.g. a directory of local bare repositories)
+        and defaults to the GitHub account named by `username`.
 
-        Attempts to execute the 'setup_git.ps1' script located in the 'scripts'
-        directory to perform git setup tasks.
+        Args:
+            repo_name (str): The repository name; defaults to [git] repo_name.
         """
-        try:
-            subprocess.check_call(["powershell", "-ExecutionPolicy", "Unrestricted", "../scripts/setup_git.ps1"])
-            print("Git setup (PowerShell) completed successfully!")
-        except subprocess.CalledProcessError:
-            print("Error occurred while setting up git using PowerShell script.")
+        repo_name = repo_name or self.config.git_repo_name
+        base = self.config.get('git', 'remote_base') or f'https://github.com/{self.config.git_username}'
+        return f"{base.rstrip('/')}/{repo_name}.git"
 
-    def execute_git_setup(self):
+    @timed('ProjectSetup')
+    def execute_git_setup(self, paths=GIT_TRACKED_FILES, remote_url=None):
         """
-        Determines the environment and decides which git setup script to run.
+        Initializes the project's git repository without spawning git.
+
+        Writes the repository, a first commit of the generated files, the
+        `main` branch and the `origin` remote directly (see
+        `src.git_repository`). Pushing is deferred to `push_repositories`.
+
+        Args:
+            paths (iterable): The files to commit, relative to the project.
+            remote_url (str): The `origin` URL; defaults to `git_remote_url()`.
+
+        Returns:
+            GitRepository: The new repository, or None if one already existed.
         """
-        # Check the OS to determine the script to run
-        if os.name == 'posix':  # Unix-like OS
-            self.execute_git_setup_shell()
-        elif os.name == 'nt':  # Windows
-            self.execute_git_setup_powershell()
-        else:
-            print("Unsupported OS.")
+        repo = initialize_repository(
+            self.project_dir, paths,
+            identity=GitIdentity.detect(self.config.git_username),
+            remote_url=remote_url or self.git_remote_url(),
+        )
+        if repo is None:
+            print("Git has already been initialized in this directory.")
+        return repo
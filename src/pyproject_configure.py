@@ -4,11 +4,16 @@ specified configuration file.
 
 The PyProjectConfigurer class reads a configuration file (default is config.
 ini), extracts metadata and dependencies information, and uses it to generate
-or update a pyproject.toml file for a Python project.
+or update a pyproject.toml file for a Python project. A project that keeps a
+pyproject.toml.tmpl in its [Templates] directory gets that compiled template
+rendered instead of the default TOML serialization.
 """
 
-import configparser
-import toml
+import os
+from src.build_state import write_if_changed
+from src.instrumentation import timed
+from src.settings import DEFAULT_CONFIG_PATH, load_settings
+from src.templating import find_template
 
 class PyProjectConfigurer:
     """
@@ -20,21 +25,25 @@ class PyProjectConfigurer:
     pyproject.toml file to reflect this information, facilitating the
     management of build system configurations and project dependencies.
     """
-    def __init__(self, config_path='../config/conf.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_path)
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH, project_dir='.', template=None):
+        self.config = load_settings(config_path)
+        self.project_dir = project_dir
+        self.template = template if template is not None else find_template(self.config, 'pyproject.toml')
 
-    def configure_pyproject_toml(self):
+    def render_pyproject_toml(self):
         """
-        Configures a pyproject.toml file based on the information in the
-        specified configuration file.
+        Builds the contents of pyproject.toml from the configuration file.
 
-        This method reads the project metadata and dependencies from the
-        configuration file, constructs the data for pyproject.toml, and writes
-        it to the pyproject.toml file.
+        The template, if any, is rendered with `metadata`, `dependencies`
+        and `poetry` (the [tool.poetry] table with its defaults applied).
+
+        Returns:
+            str: The serialized pyproject.toml document.
         """
+        # Imported here so that loading this module does not pay for packaging.
+        from src.resolver import poetry_dependencies  # pylint: disable=import-outside-toplevel
+
         metadata = self.config['Metadata']
-        dependencies = self.config['Dependencies']
 
         data = {
             "tool": {
@@ -43,10 +52,31 @@ class PyProjectConfigurer:
                     "version": metadata.get('version', 'v1.0.0'),
                     "description": metadata.get('description'),
                     "authors": [metadata.get('authors', 'Thaddeus Thomas <thaddeus.r.thomas@gmail.com>')],
+                    "dependencies": poetry_dependencies(self.config.dependencies),
                 },
-                "dependencies": dict(dependencies.items())
             }
         }
 
-        with open(file='pyproject.toml', mode='w', encoding='utf-8') as file:
-            toml.dump(data, file)
+        if self.template is not None:
+            return self.template.render({
+                'metadata': dict(metadata.items()),
+                'dependencies': data['tool']['poetry']['dependencies'],
+                'poetry': data['tool']['poetry'],
+            })
+
+        # Imported here so that startup does not pay for loading toml.
+        import toml  # pylint: disable=import-outside-toplevel
+
+        return toml.dumps(data)
+
+    @timed('PyProjectConfigurer')
+    def configure_pyproject_toml(self):
+        """
+        Configures a pyproject.toml file based on the information in the
+        specified configuration file.
+
+        This method reads the project metadata and dependencies from the
+        configuration file, constructs the data for pyproject.toml, and writes
+        it to the pyproject.toml file.
+        """
+        write_if_changed(os.path.join(self.project_dir, 'pyproject.toml'), self.render_pyproject_toml())
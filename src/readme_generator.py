@@ -6,6 +6,15 @@ and license from the repository, and writes them into a README.md file. It
 also checks for common directory structures like tests, scripts, data, and
 configurations, and notes them in the README.md file.
 
+The repository is scanned once with `os.scandir`: the top-level listing
+answers the directory-structure checks, and the traversal for a description
+streams each Python file only up to its first docstring line, skipping
+excluded directories and paths ignored by the repository's .gitignore, which
+is checked through a compiled GitignoreMatcher index.
+
+The README is rendered from a compiled template: `README_TEMPLATE` by
+default, or a project's own README.md.tmpl (see src.templating).
+
 Returns:
     None: The script writes the README.md file to the repository directory.
 
@@ -15,6 +24,62 @@ generator.generate_readme()
 """
 
 import os
+from src.build_state import write_if_changed
+from src.file_emitter import read_file
+from src.gitignore import GitignoreMatcher
+from src.instrumentation import timed
+from src.templating import compile_template
+
+EXCLUDED_DIRS = frozenset({
+    '.git', '.hg', '.svn', '.venv', 'venv', '__pycache__', 'node_modules',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache', 'build', 'dist',
+})
+README_TEMPLATE = (
+    '# {{ title }}\n\n'
+    '{{ description }}\n\n'
+    '{% if dependencies %}## Dependencies\n\n{{ dependencies|join("\\n") }}\n\n{% endif %}'
+    '## Project Structure\n\n'
+    '{% if has_tests %}- `tests/`: Directory containing test files\n{% endif %}'
+    '{% if has_scripts %}- `scripts/`: Directory containing script files\n{% endif %}'
+    '{% if has_data %}- `data/`: Directory containing data files\n{% endif %}'
+    '{% if has_config %}- `config/conf.ini`: Configuration file\n{% endif %}'
+    '{% if license %}## License\n\n```\n{{ license }}\n```{% endif %}'
+)
+
+
+class RepositoryFacts:
+    """
+    Everything README generation needs to know about the repository tree.
+    """
+    __slots__ = ('description', 'has_tests', 'has_scripts', 'has_data', 'has_config')
+
+    def __init__(self, description='', has_tests=False, has_scripts=False, has_data=False, has_config=False):
+        self.description = description
+        self.has_tests = has_tests
+        self.has_scripts = has_scripts
+        self.has_data = has_data
+        self.has_config = has_config
+
+
+def first_docstring_line(path):
+    """
+    Streams a Python file until the first line that opens a docstring.
+
+    Args:
+        path (str): The file to read.
+
+    Returns:
+        str: The docstring text on that line, or an empty string.
+    """
+    try:
+        with open(path, mode='r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('"""') or line.startswith("'''"):
+                    return line.strip('"""').strip("'''").strip()
+    except (OSError, UnicodeDecodeError):
+        pass
+    return ''
+
 
 class READMEGenerator:
     """
@@ -24,8 +89,58 @@ class READMEGenerator:
     and write them into a README.md file. The information includes project
     description, dependencies, license, and common directory structures.
     """
-    def __init__(self, repo_path='.'):
+    def __init__(self, repo_path='.', excluded_dirs=EXCLUDED_DIRS, template=None, metadata=None):
         self.repo_path = repo_path
+        self.excluded_dirs = frozenset(excluded_dirs)
+        self.metadata = dict(metadata or {})
+        self.template = template if template is not None else compile_template(README_TEMPLATE, 'README.md')
+        self._facts = None
+        self._facts_pending = False
+
+    @timed('READMEGenerator')
+    def scan_repository(self):
+        """
+        Collects every repository fact the README needs in a single pass.
+
+        The top-level listing is read once for the tests/scripts/data/config
+        checks. The tree is then walked depth-first, files before
+        subdirectories, until a Python file with a docstring is found;
+        excluded and git-ignored directories are never entered.
+
+        Returns:
+            RepositoryFacts: The collected facts, cached on the instance.
+        """
+        if self._facts is not None:
+            return self._facts
+        facts = RepositoryFacts()
+        matcher = GitignoreMatcher.from_file(os.path.join(self.repo_path, '.gitignore'))
+        stack = [('', self.repo_path)]
+        while stack and not facts.description:
+            rel_dir, abs_dir = stack.pop()
+            try:
+                with os.scandir(abs_dir) as entries:
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not rel_dir:
+                    facts.has_tests |= entry.name == 'tests' and is_dir
+                    facts.has_scripts |= entry.name == 'scripts' and is_dir
+                    facts.has_data |= entry.name == 'data' and is_dir
+                    if entry.name == 'config' and is_dir:
+                        facts.has_config = os.path.isfile(os.path.join(entry.path, 'conf.ini'))
+                if is_dir:
+                    if entry.name not in self.excluded_dirs and not matcher.is_ignored(rel_path, True):
+                        subdirs.append((rel_path, entry.path))
+                elif (not facts.description and entry.name.endswith('.py')
+                      and not matcher.is_ignored(rel_path, False)):
+                    facts.description = first_docstring_line(entry.path)
+            stack.extend(reversed(subdirs))
+        self._facts = facts
+        return facts
 
     def extract_description(self):
         """
@@ -37,19 +152,7 @@ class READMEGenerator:
         Returns:
             str: The extracted project description, or an empty string if not found.
         """
-        description = ''
-        for root, dirs, files in os.walk(self.repo_path):
-            for file in files:
-                if file.endswith('.py'):
-                    with open(os.path.join(root, file), mode='r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                    for line in lines:
-                        if line.startswith('"""') or line.startswith("'''"):
-                            description = line.strip('"""').strip("'''").strip()
-                            break
-                    if description:
-                        break
-        return description
+        return self.scan_repository().description
 
     def extract_dependencies(self):
         """
@@ -61,12 +164,8 @@ class READMEGenerator:
         Returns:
             list: A list of dependencies, or an empty list if requirements.txt is not found.
         """
-        dependencies = []
-        req_file_path = os.path.join(self.repo_path, 'requirements.txt')
-        if os.path.exists(req_file_path):
-            with open(req_file_path, mode='r', encoding='utf-8') as f:
-                dependencies = [line.strip() for line in f.readlines()]
-        return dependencies
+        text = read_file(os.path.join(self.repo_path, 'requirements.txt'))
+        return [line.strip() for line in text.splitlines()] if text is not None else []
 
     def extract_license(self):
         """
@@ -78,62 +177,90 @@ class READMEGenerator:
         Returns:
             str: The license text, or an empty string if LICENSE file is not found.
         """
-        license_text = ''
-        license_file_path = os.path.join(self.repo_path, 'LICENSE')
-        if os.path.exists(license_file_path):
-            with open(license_file_path, mode='r', encoding='utf-8') as f:
-                license_text = f.read()
-        return license_text
+        return read_file(os.path.join(self.repo_path, 'LICENSE')) or ''
 
     def check_for_tests(self):
         """
         Checks for the existence of a tests directory.
 
-        This method checks whether a directory named 'tests' exists in the repository.
-
         Returns:
             bool: True if 'tests' directory exists, False otherwise.
         """
-        test_dir_path = os.path.join(self.repo_path, 'tests')
-        return os.path.exists(test_dir_path)
+        return self.scan_repository().has_tests
 
     def check_for_scripts(self):
         """
         Checks for the existence of a scripts directory.
 
-        This method checks whether a directory named 'scripts' exists in the repository.
-
         Returns:
             bool: True if 'scripts' directory exists, False otherwise.
         """
-        script_dir_path = os.path.join(self.repo_path, 'scripts')
-        return os.path.exists(script_dir_path)
+        return self.scan_repository().has_scripts
 
     def check_for_data(self):
         """
         Checks for the existence of a data directory.
 
-        This method checks whether a directory named 'data' exists in the repository.
-
         Returns:
             bool: True if 'data' directory exists, False otherwise.
         """
-        data_dir_path = os.path.join(self.repo_path, 'data')
-        return os.path.exists(data_dir_path)
+        return self.scan_repository().has_data
 
     def check_for_config(self):
         """
         Checks for the existence of a config/conf.ini file.
 
-        This method checks whether a file named 'conf.ini' exists in the 'config' directory
-        of the repository.
-
         Returns:
             bool: True if 'config/conf.ini' file exists, False otherwise.
         """
-        config_file_path = os.path.join(self.repo_path, 'config', 'conf.ini')
-        return os.path.exists(config_file_path)
+        return self.scan_repository().has_config
+
+    def readme_context(self):
+        """
+        Collects the values the README template is rendered with.
+
+        Returns:
+            dict: title, description, dependencies, license, has_tests,
+            has_scripts, has_data, has_config and metadata (the [Metadata]
+            section, for project templates).
+        """
+        facts = self.scan_repository()
+        return {
+            'title': os.path.basename(os.path.abspath(self.repo_path)),
+            'description': facts.description,
+            'dependencies': self.extract_dependencies(),
+            'license': self.extract_license(),
+            'has_tests': facts.has_tests,
+            'has_scripts': facts.has_scripts,
+            'has_data': facts.has_data,
+            'has_config': facts.has_config,
+            'metadata': self.metadata,
+        }
+
+    def fingerprint(self):
+        """
+        Returns everything README.md is rendered from, rescanning the repository.
 
+        The facts collected here are kept for the next `generate_readme`, so
+        a pipeline run that fingerprints and then regenerates the README
+        walks the tree once.
+        """
+        self._facts = None
+        context = self.readme_context()
+        self._facts_pending = True
+        return [self.template.source, context]
+
+    def render_readme(self):
+        """
+        Builds the contents of README.md for the repository.
+
+        Returns:
+            str: The README text, including project description, dependencies,
+            license, and common directory structures.
+        """
+        return self.template.render(self.readme_context())
+
+    @timed('READMEGenerator')
     def generate_readme(self):
         """
         Generates a README.md file for the repository.
@@ -141,44 +268,11 @@ class READMEGenerator:
         This method creates a README.md file in the repository root, and
         populates it with information extracted from the repository, including
         project description, dependencies, license, and common directory
-        structures.
-        """
-        project_title = os.path.basename(self.repo_path)
-        description = self.extract_description()
-        dependencies = self.extract_dependencies()
-        license_text = self.extract_license()
-        tests_exist = self.check_for_tests()
-        scripts_exist = self.check_for_scripts()
-        data_exist = self.check_for_data()
-        config_exist = self.check_for_config()
-        with open(os.path.join(self.repo_path, 'README.md'), mode='w', encoding='utf-8') as f:
-            f.write(f'# {project_title}\n\n')
-            f.write(f'{description}\n\n')
-            if dependencies:
-                f.write('## Dependencies\n\n')
-                f.write('\n'.join(dependencies) + '\n\n')
-            if license_text:
-                f.write('## License\n\n')
-                f.write(f'```\n{license_text}\n```')
-
-        with open(os.path.join(self.repo_path, 'README.md'), mode='w', encoding='utf-8') as f:
-            f.write(f'# {project_title}\n\n')
-            f.write(f'{description}\n\n')
-
-            if dependencies:
-                f.write('## Dependencies\n\n')
-                f.write('\n'.join(dependencies) + '\n\n')
-
-            f.write('## Project Structure\n\n')
-            if tests_exist:
-                f.write('- `tests/`: Directory containing test files\n')
-            if scripts_exist:
-                f.write('- `scripts/`: Directory containing script files\n')
-            if data_exist:
-                f.write('- `data/`: Directory containing data files\n')
-            if config_exist:
-                f.write('- `config/conf.ini`: Configuration file\n')
-
-            if license_text:
-                f.write('## License\n\n')
-                f.write(f'```\n{license_text}\n```')
+        structures. The file is written once, and left untouched if its
+        content is unchanged. The repository is rescanned unless `fingerprint`
+        has just scanned it.
+        """
+        if not self._facts_pending:
+            self._facts = None
+        self._facts_pending = False
+        write_if_changed(os.path.join(self.repo_path, 'README.md'), self.render_readme())
@@ -0,0 +1,525 @@
+"""resolver.py
+Dependency resolution and lockfiles from a local package-index directory.
+
+This module turns the [Dependencies] section of conf.ini into pinned
+requirements. Entries are either `name = "<constraint>"`, where Poetry-style
+carets and tildes are accepted (`requests = "^2.31"`), or `<alias> =
+"<requirement>"` such as `dependency1 = "pylint"`; a `python` entry is the
+project's Python constraint rather than a package.
+
+`PackageIndex` reads wheels and sdists from a local directory (flat, as
+for `pip --find-links`, or one subdirectory per project). Parsed metadata
+and file hashes are kept in a persistent JSON index keyed by path, size and
+mtime, so a distribution is opened once, ever. `Resolver` is a backtracking
+resolver over that index. Its results are stored in the same JSON index,
+keyed by the requirement set, the target environment and the index
+contents, so resolving the same dependency set for many projects is a
+lookup instead of a new solve. `render_lockfile` writes the full pinned set
+with hashes in pip's `--require-hashes` format.
+
+Ex. Usage:
+python_spec, requirements = parse_dependencies(config['Dependencies'])
+resolution = Resolver(PackageIndex('wheelhouse')).resolve(requirements)
+print(render_lockfile(resolution))
+"""
+
+import email.parser
+import hashlib
+import json
+import os
+import re
+import tarfile
+import tempfile
+import threading
+import zipfile
+
+from packaging.markers import default_environment
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.tags import sys_tags
+from packaging.utils import (InvalidSdistFilename, InvalidWheelFilename, canonicalize_name, parse_sdist_filename,
+                             parse_wheel_filename)
+from packaging.version import InvalidVersion, Version
+
+from src.instrumentation import recorder
+from src.template_cache import DEFAULT_CACHE_DIR
+
+INDEX_FILE = 'packages.json'
+MAX_CACHED_RESOLUTIONS = 256
+SDIST_SUFFIXES = ('.tar.gz', '.zip')
+CONSTRAINT_RE = re.compile(r'^\s*(?:[<>=!~^*]|\d)')
+
+
+class DependencyError(ValueError):
+    """
+    Raised for a [Dependencies] entry that is not a valid requirement.
+    """
+
+
+class ResolutionError(DependencyError):
+    """
+    Raised when no set of versions in the index satisfies the requirements.
+    """
+
+
+def poetry_constraint(constraint):
+    """
+    Converts a Poetry-style version constraint into a PEP 440 specifier.
+
+    '^1.2.3' becomes '>=1.2.3,<2.0.0', '~1.2' becomes '>=1.2,<1.3', a bare
+    version is pinned with '==' and '*' allows any version.
+    """
+    parts = []
+    for clause in (clause.strip() for clause in constraint.split(',')):
+        if clause in ('', '*'):
+            continue
+        if clause[0] in '^~' and clause[:2] != '~=':
+            base = clause[1:].strip()
+            numbers = [int(number) for number in re.findall(r'\d+', base.split('+')[0])[:3]]
+            if not numbers:
+                raise DependencyError(f"invalid version constraint {constraint!r}")
+            if clause[0] == '^':
+                index = next((i for i, number in enumerate(numbers) if number), len(numbers) - 1)
+            else:
+                index = min(1, len(numbers) - 1) if len(numbers) > 1 else 0
+            upper = numbers[:index + 1]
+            upper[-1] += 1
+            upper += [0] * (len(numbers) - len(upper))
+            parts += [f'>={base}', '<' + '.'.join(str(number) for number in upper)]
+        elif clause[0].isdigit():
+            parts.append(f'=={clause}')
+        else:
+            parts.append(clause)
+    return ','.join(parts)
+
+
+def parse_dependencies(section):
+    """
+    Parses a [Dependencies] section.
+
+    Args:
+        section (Mapping): The conf.ini entries.
+
+    Returns:
+        tuple: (SpecifierSet or None for the `python` entry, list of Requirement).
+
+    Raises:
+        DependencyError: If an entry cannot be parsed.
+    """
+    python_spec = None
+    requirements = []
+    for key, value in section.items():
+        try:
+            if key.lower() == 'python':
+                python_spec = SpecifierSet(poetry_constraint(value))
+            elif CONSTRAINT_RE.match(value):
+                requirements.append(Requirement(key + poetry_constraint(value)))
+            else:
+                requirements.append(Requirement(value))
+        except (InvalidRequirement, InvalidSpecifier) as err:
+            raise DependencyError(f"invalid dependency {key} = {value!r}: {err}") from err
+    return python_spec, requirements
+
+
+def poetry_dependencies(section):
+    """
+    Converts a [Dependencies] section into a [tool.poetry.dependencies] table.
+
+    Returns:
+        dict: Package name to a version constraint ('*' for any), or to an
+        inline table when extras or markers are present.
+    """
+    python_spec, requirements = parse_dependencies(section)
+    table = {'python': str(python_spec)} if python_spec is not None else {}
+    for requirement in requirements:
+        version = str(requirement.specifier) or '*'
+        if requirement.extras or requirement.marker:
+            entry = {'version': version}
+            if requirement.extras:
+                entry['extras'] = sorted(requirement.extras)
+            if requirement.marker:
+                entry['markers'] = str(requirement.marker)
+            table[requirement.name] = entry
+        else:
+            table[requirement.name] = version
+    return table
+
+
+class Candidate:
+    """
+    One distribution file of one version of a project in the index.
+    """
+    __slots__ = ('name', 'version', 'requires', 'requires_python', 'filename', 'sha256')
+
+    def __init__(self, name, version, requires, requires_python, filename, sha256):
+        self.name = name
+        self.version = version
+        self.requires = requires
+        self.requires_python = requires_python
+        self.filename = filename
+        self.sha256 = sha256
+
+    def dependencies(self, extras, environment):
+        """
+        Returns the requirements that apply for the requested extras.
+        """
+        result = []
+        for text in self.requires:
+            try:
+                requirement = Requirement(text)
+            except InvalidRequirement:
+                continue
+            if requirement.marker is None:
+                result.append(requirement)
+                continue
+            for extra in ('',) + tuple(sorted(extras)):
+                if requirement.marker.evaluate({**environment, 'extra': extra}):
+                    result.append(requirement)
+                    break
+        return result
+
+
+def _read_metadata(path):
+    """
+    Reads the core metadata of a wheel or sdist without unpacking it.
+    """
+    text = None
+    if path.endswith('.whl') or path.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            member = next((name for name in names if name.count('/') == 1 and name.endswith('.dist-info/METADATA')),
+                          None)
+            member = member or next((name for name in names if name.count('/') == 1 and name.endswith('/PKG-INFO')),
+                                    None)
+            if member:
+                text = archive.read(member).decode('utf-8', 'replace')
+    else:
+        with tarfile.open(path, mode='r:gz') as archive:
+            for member in archive:
+                if member.name.count('/') == 1 and member.name.endswith('/PKG-INFO'):
+                    text = archive.extractfile(member).read().decode('utf-8', 'replace')
+                    break
+    message = email.parser.HeaderParser().parsestr(text or '')
+    return message.get_all('Requires-Dist') or [], message.get('Requires-Python')
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, mode='rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PackageIndex:
+    """
+    The distributions in a local directory, with a persistent metadata cache.
+    """
+
+    def __init__(self, directory, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Initializes a new instance of the PackageIndex class.
+
+        Args:
+            directory (str): The directory holding wheels and sdists.
+            cache_dir (str): Where the JSON index of parsed metadata and of
+            earlier resolutions is kept.
+        """
+        self.directory = os.path.abspath(directory)
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._projects = None
+        self._fingerprint = None
+        self._dirty = False
+        self.cache = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, mode='r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            cache = {}
+        cache.setdefault('files', {})
+        cache.setdefault('resolutions', {})
+        return cache
+
+    def save(self):
+        """
+        Writes the JSON index back if it changed.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, mode='w', encoding='utf-8') as file:
+                json.dump(self.cache, file, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+    def _scan(self):
+        supported = set(sys_tags())
+        projects = {}
+        stats = []
+        for root, _, files in os.walk(self.directory):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                try:
+                    if file_name.endswith('.whl'):
+                        name, version, _, tags = parse_wheel_filename(file_name)
+                        if supported.isdisjoint(tags):
+                            continue
+                        is_wheel = True
+                    elif file_name.endswith(SDIST_SUFFIXES):
+                        name, version = parse_sdist_filename(file_name)
+                        is_wheel = False
+                    else:
+                        continue
+                except (InvalidWheelFilename, InvalidSdistFilename, InvalidVersion):
+                    continue
+                stat = os.stat(path)
+                stats.append((os.path.relpath(path, self.directory), stat.st_size, stat.st_mtime_ns))
+                entry = self.cache['files'].get(path)
+                if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+                    recorder.add('cache_misses', 1)
+                    try:
+                        requires, requires_python = _read_metadata(path)
+                    except (OSError, zipfile.BadZipFile, tarfile.TarError):
+                        continue
+                    entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'requires': requires,
+                             'requires_python': requires_python, 'sha256': _file_sha256(path)}
+                    self.cache['files'][path] = entry
+                    self._dirty = True
+                else:
+                    recorder.add('cache_hits', 1)
+                versions = projects.setdefault(name, {})
+                # Prefer a wheel over an sdist of the same version.
+                if version not in versions or (is_wheel and not versions[version][1]):
+                    candidate = Candidate(name, version, entry['requires'], entry['requires_python'],
+                                          file_name, entry['sha256'])
+                    versions[version] = (candidate, is_wheel)
+        self._projects = {
+            name: [candidate for _, (candidate, _) in sorted(versions.items(), reverse=True)]
+            for name, versions in projects.items()
+        }
+        seen = {os.path.join(self.directory, rel_path) for rel_path, _, _ in stats}
+        prefix = self.directory + os.sep
+        for path in [path for path in self.cache['files'] if path.startswith(prefix) and path not in seen]:
+            del self.cache['files'][path]
+            self._dirty = True
+        self._fingerprint = hashlib.sha256(json.dumps(sorted(stats)).encode('utf-8')).hexdigest()
+
+    def candidates(self, name):
+        """
+        Returns the candidates for a project, newest version first.
+        """
+        if self._projects is None:
+            self._scan()
+        return self._projects.get(canonicalize_name(name), [])
+
+    def fingerprint(self):
+        """
+        Returns a digest of the index contents (file names, sizes and mtimes).
+        """
+        if self._fingerprint is None:
+            self._scan()
+        return self._fingerprint
+
+    def cached_resolution(self, key):
+        return self.cache['resolutions'].get(key)
+
+    def store_resolution(self, key, value):
+        with self._lock:
+            resolutions = self.cache['resolutions']
+            resolutions.pop(key, None)
+            resolutions[key] = value
+            while len(resolutions) > MAX_CACHED_RESOLUTIONS:
+                del resolutions[next(iter(resolutions))]
+            self._dirty = True
+
+
+class Resolution:
+    """
+    A pinned, consistent set of distributions.
+    """
+    __slots__ = ('requirements', 'pins', 'parents')
+
+    def __init__(self, requirements, pins, parents):
+        """
+        Args:
+            requirements (list): The top-level Requirement objects.
+            pins (dict): Canonical name to (name, version, filename, sha256).
+            parents (dict): Canonical name to the sorted names requiring it.
+        """
+        self.requirements = requirements
+        self.pins = pins
+        self.parents = parents
+
+    def version(self, name):
+        return self.pins[canonicalize_name(name)][1]
+
+    def as_dict(self):
+        return {'pins': self.pins, 'parents': self.parents}
+
+
+class Resolver:
+    """
+    A backtracking resolver over a PackageIndex.
+    """
+
+    def __init__(self, index, python_version=None, environment=None):
+        """
+        Initializes a new instance of the Resolver class.
+
+        Args:
+            index (PackageIndex): Where candidates come from.
+            python_version (str): The target Python, e.g. '3.11'; defaults to
+            the running interpreter.
+            environment (dict): Overrides for the PEP 508 marker environment.
+        """
+        self.index = index
+        self.environment = default_environment()
+        if python_version:
+            self.environment.update(python_version=python_version, python_full_version=python_version)
+        self.environment.update(environment or {})
+        self.python = Version(self.environment['python_full_version'])
+        self._conflict = None
+
+    def cache_key(self, requirements):
+        key = [sorted(str(requirement) for requirement in requirements), self.environment, self.index.fingerprint()]
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def resolve(self, requirements, python_spec=None):
+        """
+        Pins every requirement and its transitive dependencies.
+
+        Args:
+            requirements (list): Requirement objects or strings.
+            python_spec (SpecifierSet): The project's Python constraint,
+            checked against the target Python.
+
+        Returns:
+            Resolution: The newest consistent set of versions.
+
+        Raises:
+            ResolutionError: If the requirements cannot be satisfied.
+        """
+        requirements = [Requirement(str(requirement)) for requirement in requirements]
+        if python_spec is not None and not python_spec.contains(self.python, prereleases=True):
+            raise ResolutionError(f"the project requires python{python_spec}, the target is {self.python}")
+        key = self.cache_key(requirements)
+        cached = self.index.cached_resolution(key)
+        recorder.add('cache_misses' if cached is None else 'cache_hits', 1)
+        if cached is not None:
+            return Resolution(requirements, {name: tuple(pin) for name, pin in cached['pins'].items()},
+                              cached['parents'])
+        self._conflict = None
+        # Dependency markers are evaluated by Candidate.dependencies, the project's own here.
+        queue = [(requirement, None) for requirement in requirements
+                 if requirement.marker is None or requirement.marker.evaluate({**self.environment, 'extra': ''})]
+        solution = self._solve({}, {}, queue)
+        if solution is None:
+            raise ResolutionError(self._conflict or "the requirements cannot be satisfied")
+        pinned, parents = solution
+        resolution = Resolution(
+            requirements,
+            {name: (candidate.name, str(candidate.version), candidate.filename, candidate.sha256)
+             for name, (candidate, _) in sorted(pinned.items())},
+            {name: sorted(names) for name, names in sorted(parents.items())},
+        )
+        self.index.store_resolution(key, resolution.as_dict())
+        self.index.save()
+        return resolution
+
+    def _solve(self, pinned, constraints, queue):
+        """
+        Satisfies `queue` on top of `pinned`; returns (pinned, parents) or None.
+
+        `pinned` maps names to (Candidate, extras); `constraints` maps names to
+        the requirements seen so far. Both are copied on every branch.
+        """
+        parents = {}
+        pinned = dict(pinned)
+        constraints = {name: list(requirements) for name, requirements in constraints.items()}
+        queue = list(queue)
+        while queue:
+            requirement, parent = queue.pop(0)
+            name = canonicalize_name(requirement.name)
+            if parent is not None:
+                parents.setdefault(name, set()).add(parent)
+            constraints.setdefault(name, []).append(requirement)
+            if name in pinned:
+                candidate, extras = pinned[name]
+                if not requirement.specifier.contains(candidate.version, prereleases=True):
+                    self._conflict = (f"{requirement} (required by {parent or 'the project'}) conflicts with "
+                                      f"{candidate.name}=={candidate.version}")
+                    return None
+                new_extras = set(requirement.extras) - extras
+                if new_extras:
+                    pinned[name] = (candidate, extras | new_extras)
+                    queue += [(dependency, name) for dependency in
+                              candidate.dependencies(new_extras, self.environment)]
+                continue
+            specifiers = [item.specifier for item in constraints[name]]
+            extras = set().union(*(item.extras for item in constraints[name]))
+            candidates = [
+                candidate for candidate in self.index.candidates(name)
+                if all(specifier.contains(candidate.version, prereleases=True) for specifier in specifiers)
+                and (not candidate.requires_python
+                     or SpecifierSet(candidate.requires_python).contains(self.python, prereleases=True))
+            ]
+            # Like pip, pre-releases are only used if asked for or if nothing else fits.
+            if not any(specifier.prereleases for specifier in specifiers):
+                candidates = [candidate for candidate in candidates if not candidate.version.is_prerelease] \
+                    or candidates
+            if not candidates:
+                self._conflict = f"no version of {requirement.name} in the index satisfies " + \
+                    ', '.join(str(item) for item in constraints[name])
+                return None
+            for candidate in candidates:
+                branch = dict(pinned)
+                branch[name] = (candidate, extras)
+                solution = self._solve(branch, constraints,
+                                       queue + [(dependency, name) for dependency in
+                                                candidate.dependencies(extras, self.environment)])
+                if solution is not None:
+                    for child, names in solution[1].items():
+                        parents.setdefault(child, set()).update(names)
+                    return solution[0], parents
+            return None
+        return pinned, parents
+
+
+def render_pinned_requirements(resolution):
+    """
+    Renders the top-level requirements pinned to their resolved versions.
+
+    Returns:
+        str: requirements.txt contents, one `name[extras]==version` per line.
+    """
+    lines = []
+    for requirement in resolution.requirements:
+        extras = f"[{','.join(sorted(requirement.extras))}]" if requirement.extras else ''
+        marker = f'; {requirement.marker}' if requirement.marker else ''
+        name = canonicalize_name(requirement.name)
+        version = resolution.pins[name][1] if name in resolution.pins else None
+        lines.append(f'{requirement.name}{extras}=={version}{marker}' if version else str(requirement))
+    return ''.join(f'{line}\n' for line in lines)
+
+
+def render_lockfile(resolution):
+    """
+    Renders every pinned distribution with its hash, for `pip install --require-hashes -r`.
+
+    Returns:
+        str: The lockfile contents.
+    """
+    lines = ['# Pinned from conf.ini [Dependencies]. Install with: pip install --require-hashes -r requirements.lock']
+    for name, (display_name, version, filename, sha256) in resolution.pins.items():
+        lines.append(f'{display_name}=={version} \\')
+        lines.append(f'    --hash=sha256:{sha256}')
+        via = resolution.parents.get(name)
+        lines.append(f"    # via {', '.join(via)}" if via else '    # via -r requirements.txt')
+        lines.append(f'    # from {filename}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,188 @@
+"""script_runner.py
+Concurrent execution of project shell scripts with streamed output.
+
+This module provides the `ScriptRunner` class. It expands glob patterns such
+as `scripts/backups/*.sh` into the matching script files and runs them with
+bash on a bounded thread pool. Each script's stdout and stderr are streamed
+line by line as they are produced, prefixed with the script name, instead of
+being buffered until exit. Scripts that exceed their timeout are killed. Every
+run yields a `ScriptResult` with the exit code and duration.
+
+Ex. Usage:
+runner = ScriptRunner(max_workers=4, timeout=60)
+for result in runner.run(['scripts/backups/*.sh']):
+    print(result.name, result.returncode, f'{result.duration:.2f}s')
+"""
+
+import glob
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.instrumentation import recorder
+
+
+class ScriptResult:
+    """
+    The outcome of one script run.
+    """
+    __slots__ = ('path', 'returncode', 'duration', 'timed_out')
+
+    def __init__(self, path, returncode, duration, timed_out=False):
+        self.path = path
+        self.returncode = returncode
+        self.duration = duration
+        self.timed_out = timed_out
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"ScriptResult({self.path!r}, returncode={self.returncode}, duration={self.duration:.3f})"
+
+
+def expand_scripts(patterns):
+    """
+    Expands glob patterns into an ordered, duplicate-free list of files.
+
+    Args:
+        patterns (str or iterable): A pattern or patterns such as 'scripts/*.sh'.
+        A pattern without wildcards names a single script.
+
+    Returns:
+        list: The matching regular files, sorted within each pattern.
+    """
+    if isinstance(patterns, (str, os.PathLike)):
+        patterns = [patterns]
+    paths = []
+    for pattern in patterns:
+        paths.extend(path for path in sorted(glob.glob(os.fspath(pattern))) if os.path.isfile(path))
+    return list(dict.fromkeys(paths))
+
+
+def kill_process_tree(process):
+    """
+    Kills a script together with the commands it started.
+
+    On POSIX each script leads its own session, so the whole process group
+    is killed; otherwise only the interpreter process is.
+    """
+    if os.name == 'posix':
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except ProcessLookupError:
+            return
+    process.kill()
+
+
+class ScriptRunner:
+    """
+    Runs shell scripts concurrently, streaming their output as it arrives.
+    """
+
+    def __init__(self, max_workers=4, timeout=None, interpreter=('bash',), cwd=None, env=None, stream=None):
+        """
+        Initializes a new instance of the ScriptRunner class.
+
+        Args:
+            max_workers (int): The maximum number of scripts run at once.
+            timeout (float): Seconds after which a script is killed; None for no limit.
+            interpreter (tuple): The command the script path is appended to.
+            cwd (str): The working directory of the scripts.
+            env (dict): The environment of the scripts; defaults to this process's.
+            stream (file): Where prefixed output lines go; defaults to sys.stdout.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.interpreter = tuple(interpreter)
+        self.cwd = cwd
+        self.env = env
+        self.stream = stream
+        self._print_lock = threading.Lock()
+
+    def _emit(self, prefix, line):
+        stream = self.stream if self.stream is not None else sys.stdout
+        with self._print_lock:
+            stream.write(f'{prefix} {line.rstrip()}\n')
+            stream.flush()
+
+    def _pump(self, pipe, prefix):
+        with pipe:
+            for line in pipe:
+                self._emit(prefix, line)
+
+    def run_script(self, path, timeout=None):
+        """
+        Runs one script and streams its output until it exits or times out.
+
+        Args:
+            path (str): The script to run.
+            timeout (float): Overrides the runner's timeout for this script.
+
+        Returns:
+            ScriptResult: The exit code and duration of the run.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        name = os.path.basename(path)
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(  # pylint: disable=consider-using-with
+                [*self.interpreter, os.path.abspath(path)], cwd=self.cwd, env=self.env, stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace', bufsize=1,
+                start_new_session=os.name == 'posix',
+            )
+        except OSError as err:
+            self._emit(f'[{name}!]', str(err))
+            recorder.event('ScriptRunner', 'spawn failed', script=name, error=str(err))
+            return ScriptResult(path, 127, time.perf_counter() - start)
+        recorder.add('subprocess_spawns', 1)
+        pumps = [
+            threading.Thread(target=self._pump, args=(process.stdout, f'[{name}]'), daemon=True),
+            threading.Thread(target=self._pump, args=(process.stderr, f'[{name}!]'), daemon=True),
+        ]
+        for pump in pumps:
+            pump.start()
+        timed_out = False
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            kill_process_tree(process)
+            process.wait()
+            self._emit(f'[{name}!]', f"killed after {timeout}s timeout")
+            recorder.event('ScriptRunner', 'timed out', script=name, timeout=timeout)
+        for pump in pumps:
+            pump.join()
+        duration = time.perf_counter() - start
+        recorder.add('subprocess_time', duration)
+        return ScriptResult(path, process.returncode, duration, timed_out)
+
+    def run(self, patterns, timeout=None):
+        """
+        Expands `patterns` and runs every matching script concurrently.
+
+        Args:
+            patterns (str or iterable): Glob pattern(s) naming the scripts.
+            timeout (float): Overrides the runner's per-script timeout.
+
+        Returns:
+            list: One ScriptResult per script, in expansion order.
+        """
+        paths = expand_scripts(patterns)
+        if not paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as executor:
+            return list(executor.map(recorder.bind(lambda path: self.run_script(path, timeout)), paths))
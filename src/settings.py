@@ -0,0 +1,245 @@
+"""settings.py
+A single, cached loader for conf.ini shared by every component.
+
+This module provides the `Settings` class, an immutable, `__slots__`-based
+view of conf.ini, and `load_settings`, which parses a file at most once per
+(path, mtime) and hands the same object to every caller. Values are unquoted
+once at load time (`License = "mit"` reads as `mit`). `Settings` supports the
+read-only subset of the `configparser.ConfigParser` interface the components
+use (`settings['Section']['key']`, `.get`, `.items()`, `has_section`,
+`sections`), so it can be passed wherever a parsed config was expected.
+
+`Settings.to_env` exports the values as environment variables, which lets the
+shell scripts read them instead of re-parsing the INI file:
+
+    eval "$(python -m src.settings export-env config/conf.ini)"
+    echo "$SPD_GIT_USERNAME"
+
+Ex. Usage:
+settings = load_settings('config/conf.ini')
+print(settings.license, settings['Metadata'].get('version'))
+"""
+
+import argparse
+import configparser
+import os
+import re
+import shlex
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
+DEFAULT_CONFIG_PATH = 'config/conf.ini'
+ENV_PREFIX = 'SPD_'
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def unquote(value):
+    """
+    Strips surrounding whitespace and one pair of matching quotes.
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def env_name(*parts):
+    """
+    Builds an environment variable name such as SPD_GIT_USERNAME.
+    """
+    return ENV_PREFIX + '_'.join(re.sub(r'[^0-9A-Za-z]+', '_', part).strip('_').upper() for part in parts)
+
+
+class SettingsSection(Mapping):
+    """
+    A read-only section whose keys, like configparser's, are case-insensitive.
+    """
+    __slots__ = ('_values',)
+
+    def __init__(self, values):
+        self._values = {key.lower(): value for key, value in values.items()}
+
+    def __getitem__(self, key):
+        return self._values[key.lower()]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"SettingsSection({self._values!r})"
+
+
+class Settings:
+    """
+    An immutable view of a parsed conf.ini file.
+
+    Every public attribute is a read-only property over a private slot, so
+    assigning to one raises AttributeError.
+    """
+    __slots__ = ('_path', '_mtime', '_sections')
+
+    def __init__(self, path, sections, mtime=None):
+        """
+        Initializes a new instance of the Settings class.
+
+        Args:
+            path (str): The file the settings were read from.
+            sections (dict): Mapping of section name to a dict of values.
+            mtime (int): The file's modification time in nanoseconds.
+        """
+        self._path = path
+        self._mtime = mtime
+        self._sections = MappingProxyType({
+            name: SettingsSection(values) for name, values in sections.items()
+        })
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def mtime(self):
+        return self._mtime
+
+    def __reduce__(self):
+        sections = {name: dict(values) for name, values in self._sections.items()}
+        return (Settings, (self.path, sections, self.mtime))
+
+    def __getitem__(self, section):
+        return self._sections[section]
+
+    def __contains__(self, section):
+        return section in self._sections
+
+    def has_section(self, section):
+        return section in self._sections
+
+    def sections(self):
+        return list(self._sections)
+
+    def get(self, section, key, fallback=None):
+        """
+        Returns one value, or `fallback` if the section or key is missing.
+        """
+        values = self._sections.get(section)
+        return values.get(key, fallback) if values is not None else fallback
+
+    @property
+    def license(self):
+        return self.get('Settings', 'license')
+
+    @property
+    def git_username(self):
+        return self.get('git', 'username')
+
+    @property
+    def git_repo_name(self):
+        return self.get('git', 'repo_name')
+
+    @property
+    def metadata(self):
+        return self._sections.get('Metadata', SettingsSection({}))
+
+    @property
+    def dependencies(self):
+        return self._sections.get('Dependencies', SettingsSection({}))
+
+    def to_env(self):
+        """
+        Exports every value as an environment variable.
+
+        Returns:
+            dict: Mapping such as {'SPD_GIT_USERNAME': 'thomasthaddeus'}.
+        """
+        return {
+            env_name(section, key): value
+            for section, values in self._sections.items()
+            for key, value in values.items()
+        }
+
+    def export_shell(self):
+        """
+        Renders `to_env` as POSIX shell `export` statements.
+        """
+        return ''.join(f'export {name}={shlex.quote(value)}\n' for name, value in self.to_env().items())
+
+
+def parse_settings(path, mtime=None):
+    """
+    Parses conf.ini into a Settings object without consulting the cache.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    with open(path, mode='r', encoding='utf-8') as file:
+        parser.read_file(file)
+    sections = {
+        section: {key: unquote(value) for key, value in parser[section].items()}
+        for section in parser.sections()
+    }
+    return Settings(path, sections, mtime)
+
+
+def load_settings(path=DEFAULT_CONFIG_PATH):
+    """
+    Returns the Settings for `path`, parsing the file only when it changed.
+
+    Results are memoized by (absolute path, mtime), so every component of a
+    run, and every project of a batch, share one parsed object.
+
+    Args:
+        path (str): The conf.ini file.
+
+    Returns:
+        Settings: The parsed settings.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+    """
+    abs_path = os.path.abspath(path)
+    key = (abs_path, os.stat(abs_path).st_mtime_ns)
+    settings = _cache.get(key)
+    if settings is None:
+        with _cache_lock:
+            settings = _cache.get(key)
+            if settings is None:
+                settings = parse_settings(abs_path, key[1])
+                for old_key in [k for k in _cache if k[0] == abs_path]:
+                    del _cache[old_key]
+                _cache[key] = settings
+    return settings
+
+
+def resolve_settings(config):
+    """
+    Accepts either a config path or an already-parsed config.
+
+    Args:
+        config (str or Settings or mapping): A conf.ini path or parsed values.
+
+    Returns:
+        Settings or mapping: The parsed config.
+    """
+    if isinstance(config, (str, os.PathLike)):
+        return load_settings(config)
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or export conf.ini settings.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export-env', help="print shell export statements for every setting")
+    export.add_argument('config', nargs='?', default=DEFAULT_CONFIG_PATH)
+    args = parser.parse_args(argv)
+    print(load_settings(args.config).export_shell(), end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""template_bundle.py
+A versioned, compressed template pack for fully offline scaffolding.
+
+This module provides the `TemplateBundle` class, which reads .gitignore and
+license templates from a single zip archive, and `build_bundle`, which
+(re)builds that archive from a local mirror of the github/gitignore and
+choosealicense.com repositories. The archive carries an `index.json` mapping
+normalized `kind/name` keys to archive members, so a lookup is one dict probe
+followed by one member read, with no network I/O at all.
+
+Mirror layout expected by the refresh command:
+    <mirror>/gitignore/   a checkout of github/gitignore (*.gitignore, any depth)
+    <mirror>/licenses/    the `_licenses` directory of choosealicense.com (*.txt)
+
+Ex. Usage:
+python -m src.template_bundle refresh --mirror ~/mirrors --output data/templates.zip
+bundle = TemplateBundle('data/templates.zip')
+text = bundle.get('gitignore', 'Python')
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+
+BUNDLE_FORMAT = 1
+DEFAULT_BUNDLE_PATH = os.environ.get(
+    'SETUP_PROJECT_BUNDLE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'templates.zip'),
+)
+KINDS = {
+    'gitignore': ('gitignore', '.gitignore'),
+    'license': ('licenses', '.txt'),
+}
+
+_default = {}
+_default_lock = threading.Lock()
+
+
+def bundle_key(kind, name):
+    """
+    Normalizes a template lookup key; names are matched case-insensitively.
+    """
+    return f'{kind}/{name.lower()}'
+
+
+class TemplateBundle:
+    """
+    Read-only access to a template pack built by `build_bundle`.
+
+    Decompressed templates are memoized, so repeated lookups of the same
+    template (as in batch runs) cost a single dict probe.
+    """
+
+    def __init__(self, bundle_path=DEFAULT_BUNDLE_PATH):
+        """
+        Initializes a new instance of the TemplateBundle class.
+
+        Args:
+            bundle_path (str): Path of the zip archive.
+
+        Raises:
+            ValueError: If the archive is not a template bundle of a supported format.
+        """
+        self.bundle_path = bundle_path
+        self._archive = zipfile.ZipFile(bundle_path, mode='r')
+        index = json.loads(self._archive.read('index.json'))
+        if index.get('format') != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported template bundle format in {bundle_path}: {index.get('format')}")
+        self.version = index['version']
+        self.entries = index['entries']
+        self._texts = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return bundle_key(*key) in self.entries
+
+    def get(self, kind, name):
+        """
+        Returns the text of a bundled template.
+
+        Args:
+            kind (str): 'gitignore' or 'license'.
+            name (str): The template name, e.g. 'Python' or 'mit'.
+
+        Returns:
+            str: The template text, or None if it is not bundled.
+        """
+        key = bundle_key(kind, name)
+        text = self._texts.get(key)
+        if text is None:
+            member = self.entries.get(key)
+            if member is None:
+                return None
+            with self._lock:
+                text = self._archive.read(member).decode('utf-8')
+            self._texts[key] = text
+        return text
+
+    def names(self, kind):
+        """
+        Lists the bundled template names of one kind.
+        """
+        prefix = f'{kind}/'
+        return sorted(os.path.splitext(os.path.basename(member))[0]
+                      for key, member in self.entries.items() if key.startswith(prefix))
+
+
+def default_bundle():
+    """
+    Returns the shared bundle at DEFAULT_BUNDLE_PATH, or None if there is none.
+
+    Returns:
+        TemplateBundle: The opened bundle, memoized per process.
+    """
+    with _default_lock:
+        if DEFAULT_BUNDLE_PATH not in _default:
+            bundle = None
+            if os.path.exists(DEFAULT_BUNDLE_PATH):
+                try:
+                    bundle = TemplateBundle(DEFAULT_BUNDLE_PATH)
+                except (OSError, ValueError, KeyError, zipfile.BadZipFile) as err:
+                    print(f"Ignoring template bundle {DEFAULT_BUNDLE_PATH}: {err}")
+            _default[DEFAULT_BUNDLE_PATH] = bundle
+        return _default[DEFAULT_BUNDLE_PATH]
+
+
+def build_bundle(mirror_dir, bundle_path=DEFAULT_BUNDLE_PATH, version=None):
+    """
+    Builds a template bundle from a local mirror directory.
+
+    Args:
+        mirror_dir (str): Directory with `gitignore/` and `licenses/` mirrors.
+        bundle_path (str): Where to write the archive; replaced atomically.
+        version (str): Bundle version; defaults to a UTC timestamp.
+
+    Returns:
+        dict: The number of bundled templates per kind.
+    """
+    version = version or time.strftime('%Y.%m.%d.%H%M%S', time.gmtime())
+    entries = {}
+    counts = {kind: 0 for kind in KINDS}
+    directory = os.path.dirname(os.path.abspath(bundle_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp_path, mode='w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+            for kind, (subdir, suffix) in KINDS.items():
+                source_dir = os.path.join(mirror_dir, subdir)
+                for root, dirs, files in os.walk(source_dir):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                    for file_name in sorted(files):
+                        if not file_name.endswith(suffix):
+                            continue
+                        key = bundle_key(kind, file_name[:-len(suffix)])
+                        if key in entries:
+                            # Top-level templates win over nested ones of the same name.
+                            continue
+                        member = f'{subdir}/{os.path.relpath(os.path.join(root, file_name), source_dir)}'
+                        archive.write(os.path.join(root, file_name), arcname=member.replace(os.sep, '/'))
+                        entries[key] = member.replace(os.sep, '/')
+                        counts[kind] += 1
+            index = {'format': BUNDLE_FORMAT, 'version': version, 'entries': entries}
+            archive.writestr('index.json', json.dumps(index, indent=1, sort_keys=True))
+        os.replace(tmp_path, bundle_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    with _default_lock:
+        _default.pop(bundle_path, None)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the offline template bundle.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    refresh = commands.add_parser('refresh', help="rebuild the bundle from a local mirror directory")
+    refresh.add_argument('--mirror', required=True, help="directory containing gitignore/ and licenses/")
+    refresh.add_argument('--output', default=DEFAULT_BUNDLE_PATH, help="bundle path to write")
+    refresh.add_argument('--version', default=None, help="bundle version string")
+    info = commands.add_parser('info', help="show the contents of a bundle")
+    info.add_argument('bundle', nargs='?', default=DEFAULT_BUNDLE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'refresh':
+        counts = build_bundle(args.mirror, args.output, args.version)
+        print(f"Wrote {args.output}: {counts['gitignore']} gitignore and {counts['license']} license templates")
+    else:
+        bundle = TemplateBundle(args.bundle)
+        print(f"{args.bundle} version {bundle.version}")
+        for kind in KINDS:
+            print(f"{kind}: {', '.join(bundle.names(kind))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""template_cache.py
+A shared, content-addressed on-disk cache for remote templates.
+
+This module provides the `TemplateCache` class used by `ProjectGenerator` and
+`LicenseCreator` to fetch .gitignore and license texts. Template bodies are
+stored once per unique content (keyed by their SHA-256 digest), while a small
+JSON index maps each URL to its object and HTTP validators. Entries are
+revalidated with ETag/If-Modified-Since once their TTL expires, the store is
+kept under a byte budget with least-recently-used eviction, and an offline
+mode serves whatever is cached, however stale. Requests go through the
+shared pooled transport, and `prefetch` warms several URLs concurrently.
+
+Ex. Usage:
+cache = TemplateCache(ttl=3600)
+text = cache.get('https://raw.githubusercontent.com/github/gitignore/main/Python.gitignore')
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.http_transport import default_transport
+from src.instrumentation import recorder
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'SETUP_PROJECT_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'setup_project_directory'),
+)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class TemplateCache:
+    """
+    A size-bounded, content-addressed cache of remote text templates.
+
+    Each cached URL is recorded in `index.json` with the digest of its body,
+    the ETag and Last-Modified validators returned by the server, the time
+    it was last validated and the time it was last served. Bodies live under
+    `objects/` named by digest, so identical templates fetched from several
+    URLs are stored only once.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl=DEFAULT_TTL, offline=False, timeout=None, transport=None):
+        """
+        Initializes a new instance of the TemplateCache class.
+
+        Args:
+            cache_dir (str): Directory holding the index and object store.
+            max_bytes (int): Upper bound on the total size of stored objects.
+            ttl (float): Seconds an entry is served without revalidation.
+            offline (bool): If True, never touch the network and serve any
+            cached entry regardless of age.
+            timeout (float or tuple): Overrides the transport's timeout.
+            transport (HTTPTransport): The transport to fetch with; defaults
+            to the process-wide pooled transport.
+        """
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.offline = offline
+        self.timeout = timeout
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, mode='r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, mode='w', encoding='utf-8') as file:
+            json.dump(self.index, file, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _read_object(self, digest):
+        try:
+            with open(self._object_path(digest), mode='rb') as file:
+                return file.read().decode('utf-8')
+        except OSError:
+            return None
+
+    def _write_object(self, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, mode='wb') as file:
+                file.write(body)
+            os.replace(tmp_path, path)
+        return digest, len(body)
+
+    def _fetch(self, url, entry):
+        """
+        Performs a (conditional) GET for `url` through the shared transport.
+
+        Returns:
+            requests.Response: The server response, or None on network failure.
+        """
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        transport = self.transport if self.transport is not None else default_transport()
+        try:
+            return transport.get(url, headers=headers, timeout=self.timeout)
+        except transport.request_exception as err:
+            print(f'Failed to fetch {url}: {err}')
+            recorder.event('TemplateCache', 'fetch failed', url=url, error=str(err))
+            return None
+
+    def _url_lock(self, url):
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def get(self, url):
+        """
+        Returns the text behind `url`, using the cache where possible.
+
+        Fresh entries are served directly, without rewriting the index;
+        their access time is saved with the next insert. Expired entries are
+        revalidated with the stored validators; a 304 response refreshes the
+        entry, a 200 response replaces it. If the server cannot be reached or
+        answers with an error, a stale entry is served when one exists.
+        Concurrent requests for the same URL share one fetch; different URLs
+        are fetched in parallel.
+
+        Args:
+            url (str): The URL of the template to fetch.
+
+        Returns:
+            str: The template text, or None if it is neither cached nor
+            retrievable.
+        """
+        with self._url_lock(url):
+            with self._lock:
+                entry = self.index.get(url)
+                now = time.time()
+                if entry and (self.offline or now - entry['validated_at'] < self.ttl):
+                    text = self._read_object(entry['digest'])
+                    if text is not None:
+                        # Recorded in memory only; it reaches disk with the next insert or eviction.
+                        entry['accessed_at'] = now
+                        recorder.add('cache_hits', 1)
+                        return text
+                    del self.index[url]
+                    entry = None
+            recorder.add('cache_misses', 1)
+            if self.offline:
+                return None
+
+            response = self._fetch(url, entry)
+            if response is not None and response.status_code == 304 and entry:
+                text = self._read_object(entry['digest'])
+                if text is not None:
+                    with self._lock:
+                        entry['validated_at'] = entry['accessed_at'] = now
+                        self._save_index()
+                    return text
+                response = self._fetch(url, None)
+            if response is not None and response.status_code == 200:
+                recorder.add('bytes_fetched', len(response.content))
+                digest, size = self._write_object(response.content)
+                with self._lock:
+                    self.index[url] = {
+                        'digest': digest,
+                        'size': size,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'validated_at': now,
+                        'accessed_at': now,
+                    }
+                    self._evict()
+                    self._save_index()
+                return response.content.decode('utf-8')
+            if response is not None:
+                print(f'Failed to fetch {url}. HTTP Status Code: {response.status_code}')
+                recorder.event('TemplateCache', 'fetch failed', url=url, status=response.status_code)
+            if entry:
+                return self._read_object(entry['digest'])
+            return None
+
+    def prefetch(self, urls, max_workers=8):
+        """
+        Fetches several URLs concurrently, warming the cache.
+
+        Args:
+            urls (iterable): The URLs to fetch; duplicates are fetched once.
+            max_workers (int): Maximum number of requests in flight.
+
+        Returns:
+            dict: Mapping of each URL to its text, or None if unavailable.
+        """
+        urls = list(dict.fromkeys(urls))
+        if len(urls) <= 1:
+            return {url: self.get(url) for url in urls}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(recorder.bind(self.get), urls)))
+
+    def _evict(self):
+        """
+        Removes least-recently-used objects until the store fits `max_bytes`.
+        """
+        sizes = {}
+        last_used = {}
+        for entry in self.index.values():
+            digest = entry['digest']
+            sizes[digest] = entry['size']
+            last_used[digest] = max(last_used.get(digest, 0), entry['accessed_at'])
+        total = sum(sizes.values())
+        for digest in sorted(last_used, key=last_used.get):
+            if total <= self.max_bytes:
+                break
+            total -= sizes[digest]
+            for url in [u for u, e in self.index.items() if e['digest'] == digest]:
+                del self.index[url]
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Drops every cached entry and object.
+        """
+        with self._lock:
+            for digest in {entry['digest'] for entry in self.index.values()}:
+                try:
+                    os.remove(self._object_path(digest))
+                except OSError:
+                    pass
+            self.index = {}
+            self._save_index()
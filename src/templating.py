@@ -0,0 +1,390 @@
+"""templating.py
+A small template engine that compiles templates into cached render functions.
+
+This module provides the `Template` class. A template is parsed once and
+translated into the source of a Python function, which is compiled and
+memoized by template text, so rendering a project is a single call that
+appends pre-split literal chunks and evaluates pre-translated expressions.
+`Template.render_many` renders a batch of per-project contexts in one go.
+
+Syntax:
+    {{ metadata.name }}                      a value; missing names render as ''
+    {{ dependencies|join(", ") }}            filters, optionally with arguments
+    {% if license and not private %}...{% elif x == "y" %}...{% else %}...{% endif %}
+    {% for key, value in dependencies|items %}...{% else %}...{% endfor %}   else: only if nothing was iterated
+    {# a comment #}
+    {%- ... -%}                              '-' strips whitespace on that side
+
+Filters: upper, lower, title, trim, default, join, items, length, toml.
+
+Project-specific templates are plain files named after the output file with
+a `.tmpl` suffix (README.md.tmpl, pyproject.toml.tmpl, LICENSE.tmpl) in the
+directory named by the `directory` key of the [Templates] section of
+conf.ini; `find_template` loads them.
+
+Ex. Usage:
+template = compile_template('# {{ title }}\\n{% for dep in dependencies %}- {{ dep }}\\n{% endfor %}')
+template.render(title='demo', dependencies=['requests'])
+"""
+
+import functools
+import json
+import os
+import re
+
+TAG_RE = re.compile(r'(\{\{-?.*?-?\}\}|\{%-?.*?-?%\}|\{#.*?#\})', re.DOTALL)
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z0-9_]+)*)
+      | (?P<op>==|!=|<=|>=|<|>|\(|\)|\||,)
+    )''', re.VERBOSE)
+KEYWORDS = {'and', 'or', 'not', 'in'}
+CONSTANTS = {'true': 'True', 'false': 'False', 'none': 'None', 'True': 'True', 'False': 'False', 'None': 'None'}
+TEMPLATE_SUFFIX = '.tmpl'
+TOML_ESCAPE_RE = re.compile(r'["\\\x00-\x1f\x7f]')
+
+
+class TemplateError(ValueError):
+    """
+    Raised for a template that cannot be parsed.
+    """
+
+
+def _toml_string(value):
+    value = '' if value is None else str(value)
+    if not TOML_ESCAPE_RE.search(value):
+        return f'"{value}"'
+    # JSON string escapes are a subset of TOML basic-string escapes; only DEL
+    # is left unescaped by JSON but not allowed by TOML.
+    return json.dumps(value, ensure_ascii=False).replace('\x7f', '\\u007f')
+
+
+FILTERS = {
+    'upper': lambda value: str(value).upper(),
+    'lower': lambda value: str(value).lower(),
+    'title': lambda value: str(value).title(),
+    'trim': lambda value: str(value).strip(),
+    'default': lambda value, fallback='': value if value not in (None, '') else fallback,
+    'join': lambda value, separator='': separator.join(str(item) for item in value or ()),
+    'items': lambda value: list(value.items()) if value else [],
+    'length': lambda value: len(value) if value else 0,
+    'toml': _toml_string,
+}
+
+
+def _get(obj, key):
+    if obj is None:
+        return None
+    try:
+        return obj[key]
+    except (KeyError, IndexError, TypeError):
+        return getattr(obj, key, None)
+
+
+def _str(value):
+    return '' if value is None else str(value)
+
+
+class _ExpressionParser:
+    """
+    Translates a template expression into Python source.
+    """
+
+    def __init__(self, text, scope, where):
+        self.where = where
+        self.scope = scope
+        self.tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = TOKEN_RE.match(text, position)
+            if not match or match.end() == position:
+                raise TemplateError(f"{where}: cannot parse expression {text!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+            position = match.end()
+            while position < len(text) and text[position].isspace():
+                position += 1
+        self.position = 0
+
+    def peek(self, value=None):
+        if self.position >= len(self.tokens):
+            return None
+        token = self.tokens[self.position]
+        if value is not None and token[1] != value:
+            return None
+        return token
+
+    def take(self, value=None):
+        token = self.peek(value)
+        if token is None:
+            expected = f" {value!r}" if value else ''
+            raise TemplateError(f"{self.where}: expected{expected} in expression")
+        self.position += 1
+        return token
+
+    def parse(self):
+        code = self.parse_or()
+        if self.position != len(self.tokens):
+            raise TemplateError(f"{self.where}: unexpected {self.tokens[self.position][1]!r}")
+        return code
+
+    def parse_or(self):
+        code = self.parse_and()
+        while self.peek('or'):
+            self.take()
+            code = f'({code} or {self.parse_and()})'
+        return code
+
+    def parse_and(self):
+        code = self.parse_not()
+        while self.peek('and'):
+            self.take()
+            code = f'({code} and {self.parse_not()})'
+        return code
+
+    def parse_not(self):
+        if self.peek('not'):
+            self.take()
+            return f'(not {self.parse_not()})'
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        code = self.parse_filtered()
+        token = self.peek()
+        if token and token[1] in ('==', '!=', '<', '>', '<=', '>=', 'in'):
+            self.take()
+            return f'({code} {token[1]} {self.parse_filtered()})'
+        if token and token[1] == 'not' and self.position + 1 < len(self.tokens) \
+                and self.tokens[self.position + 1][1] == 'in':
+            self.position += 2
+            return f'({code} not in {self.parse_filtered()})'
+        return code
+
+    def parse_filtered(self):
+        code = self.parse_primary()
+        while self.peek('|'):
+            self.take()
+            kind, name = self.take()
+            if kind != 'name' or name not in FILTERS:
+                raise TemplateError(f"{self.where}: unknown filter {name!r}")
+            args = []
+            if self.peek('('):
+                self.take()
+                if not self.peek(')'):
+                    args.append(self.parse_or())
+                    while self.peek(','):
+                        self.take()
+                        args.append(self.parse_or())
+                self.take(')')
+            code = f"_f[{name!r}]({', '.join([code] + args)})"
+        return code
+
+    def parse_primary(self):
+        kind, value = self.take()
+        if kind == 'string':
+            return repr(json.loads(value) if value.startswith('"') else value[1:-1].encode().decode('unicode_escape'))
+        if kind == 'number':
+            return value
+        if value == '(':
+            code = self.parse_or()
+            self.take(')')
+            return code
+        if kind == 'name' and value not in KEYWORDS:
+            if value in CONSTANTS:
+                return CONSTANTS[value]
+            head, *attributes = value.split('.')
+            if any(attribute.startswith('_') for attribute in attributes):
+                raise TemplateError(f"{self.where}: private attributes are not accessible")
+            code = self.scope[head] if head in self.scope else f'c.get({head!r})'
+            for attribute in attributes:
+                code = f'_g({code}, {attribute!r})'
+            return code
+        raise TemplateError(f"{self.where}: unexpected {value!r}")
+
+
+def _compile_source(source, name):
+    pieces = TAG_RE.split(source)
+    lines = ['def render(c, _f=_f, _g=_g, _s=_str):', ' _o = []', ' _w = _o.append']
+    depth = 1
+    stack = []
+    scopes = [{}]
+    line_number = 1
+    strip_next = False
+    for index, piece in enumerate(pieces):
+        where = f"{name}:{line_number}"
+        line_number += piece.count('\n')
+        is_tag = index % 2 == 1
+        if not is_tag:
+            if strip_next:
+                piece = piece.lstrip()
+            following = pieces[index + 1] if index + 1 < len(pieces) else ''
+            if following[2:3] == '-':
+                piece = piece.rstrip()
+            if piece:
+                lines.append(' ' * depth + f'_w({piece!r})')
+            strip_next = False
+            continue
+        strip_next = piece[-3:-2] == '-'
+        if piece.startswith('{#'):
+            continue
+        body = piece[2:-2].strip('-').strip()
+        scope = scopes[-1]
+        if piece.startswith('{{'):
+            expression = _ExpressionParser(body, scope, where).parse()
+            lines.append(' ' * depth + f'_w(_s({expression}))')
+            continue
+        keyword, _, rest = body.partition(' ')
+        if keyword == 'if':
+            lines.append(' ' * depth + f'if {_ExpressionParser(rest, scope, where).parse()}:')
+            stack.append(['if', where, None])
+            depth += 1
+        elif keyword == 'elif':
+            if not stack or stack[-1][0] != 'if' or stack[-1][2] == 'else':
+                raise TemplateError(f"{where}: elif outside of if")
+            lines.append(' ' * (depth - 1) + f'elif {_ExpressionParser(rest, scope, where).parse()}:')
+        elif keyword == 'else':
+            if not stack or stack[-1][0] not in ('if', 'for') or stack[-1][2] == 'else':
+                raise TemplateError(f"{where}: else outside of if or for")
+            if stack[-1][0] == 'if':
+                lines.append(' ' * (depth - 1) + 'else:')
+            else:
+                # Unlike Python's for/else, the else branch renders only if the loop ran no iteration.
+                # The flag is patched in here, so loops without an else pay nothing for it.
+                for_line = stack[-1][2]
+                flag = f'_e{len(scopes) - 1}_{for_line}'
+                lines[for_line + 1:for_line + 1] = [' ' * depth + f'{flag} = False']
+                lines[for_line:for_line] = [' ' * (depth - 1) + f'{flag} = True']
+                lines.append(' ' * (depth - 1) + f'if {flag}:')
+                scopes.pop()
+            stack[-1][2] = 'else'
+        elif keyword == 'for':
+            match = re.fullmatch(r'([A-Za-z_]\w*(?:\s*,\s*[A-Za-z_]\w*)*)\s+in\s+(.+)', rest.strip(), re.DOTALL)
+            if not match:
+                raise TemplateError(f"{where}: expected 'for <name> in <expression>'")
+            names = [item.strip() for item in match.group(1).split(',')]
+            iterable = _ExpressionParser(match.group(2), scope, where).parse()
+            inner = dict(scope)
+            inner.update({item: f'_l{len(scopes)}_{item}' for item in names})
+            stack.append(['for', where, len(lines)])
+            lines.append(' ' * depth + f"for {', '.join(inner[item] for item in names)} in ({iterable} or ()):")
+            scopes.append(inner)
+            depth += 1
+        elif keyword in ('endif', 'endfor'):
+            if not stack or stack[-1][0] != keyword[3:]:
+                raise TemplateError(f"{where}: unexpected {keyword}")
+            kind, _, state = stack.pop()
+            if kind == 'for' and state != 'else':
+                scopes.pop()
+            lines.append(' ' * depth + 'pass')
+            depth -= 1
+        else:
+            raise TemplateError(f"{where}: unknown tag {keyword!r}")
+    if stack:
+        kind, where, _ = stack[-1]
+        raise TemplateError(f"{where}: {kind} is never closed")
+    lines.append(" return ''.join(_o)")
+    return '\n'.join(lines) + '\n'
+
+
+class Template:
+    """
+    A template compiled into a Python render function.
+    """
+    __slots__ = ('name', 'source', 'code', '_render')
+
+    def __init__(self, source, name='<template>'):
+        """
+        Initializes a new instance of the Template class.
+
+        Args:
+            source (str): The template text.
+            name (str): Used in error messages.
+
+        Raises:
+            TemplateError: If the template cannot be parsed.
+        """
+        self.name = name
+        self.source = source
+        self.code = _compile_source(source, name)
+        namespace = {'_f': FILTERS, '_g': _get, '_str': _str}
+        exec(compile(self.code, f'<template {name}>', 'exec'), namespace)  # pylint: disable=exec-used
+        self._render = namespace['render']
+
+    def render(self, context=None, **values):
+        """
+        Renders the template for one context.
+
+        Args:
+            context (Mapping): The values available to the template.
+            **values: Extra values, overriding `context`.
+
+        Returns:
+            str: The rendered text.
+        """
+        if values:
+            context = {**(context or {}), **values}
+        return self._render(context if context is not None else {})
+
+    def render_many(self, contexts):
+        """
+        Renders the template once per context.
+
+        Returns:
+            list: The rendered texts, in the order of `contexts`.
+        """
+        render = self._render
+        return [render(context) for context in contexts]
+
+
+@functools.lru_cache(maxsize=128)
+def compile_template(source, name='<template>'):
+    """
+    Returns the compiled Template for `source`, compiling each text only once.
+    """
+    return Template(source, name)
+
+
+def template_source(template):
+    """
+    Returns the text of a Template, or None; used in build fingerprints.
+    """
+    return template.source if template is not None else None
+
+
+@functools.lru_cache(maxsize=128)
+def _load(path, mtime_ns):  # pylint: disable=unused-argument  # mtime_ns only keys the cache
+    with open(path, mode='r', encoding='utf-8') as file:
+        return compile_template(file.read(), os.path.basename(path))
+
+
+def template_path(config, file_name):
+    """
+    Returns where the project template for an output file would be, or None if no [Templates] directory is set.
+    """
+    directory = config.get('Templates', 'directory') if config is not None else None
+    return os.path.join(directory, file_name + TEMPLATE_SUFFIX) if directory else None
+
+
+def find_template(config, file_name):
+    """
+    Loads the project template for an output file, if one is configured.
+
+    Args:
+        config (Settings): The parsed conf.ini.
+        file_name (str): The output file, e.g. 'README.md'.
+
+    Returns:
+        Template: The compiled `<directory>/<file_name>.tmpl`, or None if no
+        [Templates] directory is configured or the file does not exist.
+    """
+    path = template_path(config, file_name)
+    if path is None:
+        return None
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _load(os.path.abspath(path), mtime_ns)
@@ -0,0 +1,302 @@
+"""venv_provisioner.py
+Fast virtual environment provisioning from warm, shared base environments.
+
+This module provides the `VenvProvisioner` class. Instead of running
+`python -m venv` (and `pip install`) for every project, it builds one base
+environment per unique (interpreter, requirements) key in the shared cache
+directory and materializes per-project `.venv` directories from it. Regular
+files are hardlinked (or cloned copy-on-write where the filesystem supports
+it), while the few text files that embed the base environment's absolute path
+(activation scripts, console-script shebangs, `pyvenv.cfg`) are rewritten for
+the new location. Each materialization reports the time and bytes it saved
+compared with a cold create.
+
+Ex. Usage:
+provisioner = VenvProvisioner()
+report = provisioner.materialize('.venv', ['requests'])
+print(report)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from src.instrumentation import run_subprocess, timed
+from src.template_cache import DEFAULT_CACHE_DIR
+
+MANIFEST_NAME = '.provision-manifest.json'
+FICLONE = 0x40049409
+
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+
+def _lock_for(key):
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _clone_file(src, dst):
+    """
+    Clones `src` to `dst` with a copy-on-write reflink, falling back to a copy.
+    """
+    try:
+        import fcntl  # pylint: disable=import-outside-toplevel
+        with open(src, mode='rb') as src_file, open(dst, mode='wb') as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(src, dst)
+    except (ImportError, OSError):
+        shutil.copy2(src, dst)
+        return False
+    return True
+
+
+class ProvisionReport:
+    """
+    The outcome of materializing one virtual environment.
+    """
+
+    def __init__(self, target, key, seconds, cold_seconds, bytes_shared, bytes_copied):
+        self.target = target
+        self.key = key
+        self.seconds = seconds
+        self.cold_seconds = cold_seconds
+        self.bytes_shared = bytes_shared
+        self.bytes_copied = bytes_copied
+
+    @property
+    def seconds_saved(self):
+        return max(self.cold_seconds - self.seconds, 0.0)
+
+    def as_dict(self):
+        return {
+            'target': self.target,
+            'key': self.key,
+            'seconds': self.seconds,
+            'cold_seconds': self.cold_seconds,
+            'seconds_saved': self.seconds_saved,
+            'bytes_shared': self.bytes_shared,
+            'bytes_copied': self.bytes_copied,
+        }
+
+    def __str__(self):
+        return (f"{self.target}: {self.seconds:.3f}s (saved {self.seconds_saved:.3f}s), "
+                f"{self.bytes_shared} bytes shared, {self.bytes_copied} bytes copied")
+
+
+class VenvProvisioner:
+    """
+    A class to materialize project virtual environments from shared bases.
+
+    Hardlinked files are shared with the base environment, so they must not
+    be modified in place. pip replaces files rather than editing them, which
+    keeps installs and upgrades inside a project `.venv` safe.
+    """
+
+    def __init__(self, cache_dir=os.path.join(DEFAULT_CACHE_DIR, 'venvs'), python=sys.executable,
+                 mode='hardlink'):
+        """
+        Initializes a new instance of the VenvProvisioner class.
+
+        Args:
+            cache_dir (str): Directory holding the base environments.
+            python (str): The interpreter the environments are created with.
+            mode (str): 'hardlink', 'reflink' or 'copy'; how files are shared
+            with the base environment.
+        """
+        if mode not in ('hardlink', 'reflink', 'copy'):
+            raise ValueError(f"Unknown provisioning mode: {mode}")
+        self.cache_dir = cache_dir
+        self.python = python
+        self.mode = mode
+
+    def key(self, requirements=()):
+        """
+        Computes the base environment key for a set of requirements.
+
+        Args:
+            requirements (iterable): Requirement strings to install.
+
+        Returns:
+            str: A short hex digest of the interpreter and requirements.
+        """
+        interpreter = os.path.realpath(shutil.which(self.python) or self.python)
+        payload = json.dumps([interpreter, sorted(set(requirements))])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    @timed('VenvProvisioner')
+    def base_env(self, requirements=()):
+        """
+        Returns the base environment for `requirements`, building it if needed.
+
+        Args:
+            requirements (iterable): Requirement strings to install.
+
+        Returns:
+            str: The path of the base environment.
+        """
+        requirements = sorted(set(requirements))
+        key = self.key(requirements)
+        base_path = os.path.join(self.cache_dir, key)
+        with _lock_for(key):
+            if os.path.exists(os.path.join(base_path, MANIFEST_NAME)):
+                return base_path
+            os.makedirs(self.cache_dir, exist_ok=True)
+            build_path = tempfile.mkdtemp(dir=self.cache_dir, prefix=f'.{key}-')
+            start = time.perf_counter()
+            run_subprocess([self.python, '-m', 'venv', build_path], check=True)
+            if requirements:
+                run_subprocess([self._bin(build_path, 'python'), '-m', 'pip', 'install', '--quiet', *requirements],
+                               check=True)
+            cold_seconds = time.perf_counter() - start
+            # The manifest is written before the rename, so a base environment without one is always stale.
+            self._write_manifest(base_path, build_path, cold_seconds, requirements)
+            self._install(build_path, base_path)
+            return base_path
+
+    def _install(self, build_path, base_path):
+        """
+        Renames a finished build to `base_path`.
+
+        If another process already installed a complete environment there,
+        the build is discarded in favor of it. A directory without a
+        manifest, left by a crash, is moved aside and replaced.
+        """
+        for _ in range(3):
+            try:
+                os.rename(build_path, base_path)
+                return
+            except OSError:
+                if os.path.exists(os.path.join(base_path, MANIFEST_NAME)):
+                    shutil.rmtree(build_path, ignore_errors=True)
+                    return
+            stale_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.stale-')
+            try:
+                os.rename(base_path, os.path.join(stale_dir, 'env'))
+            except FileNotFoundError:
+                pass
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        raise OSError(f"cannot install the base environment at {base_path}")
+
+    @staticmethod
+    def _bin(env_path, name):
+        scripts = 'Scripts' if os.name == 'nt' else 'bin'
+        return os.path.join(env_path, scripts, name)
+
+    def _write_manifest(self, base_path, build_path, cold_seconds, requirements):
+        """
+        Records which files embed the environment path and must be rewritten.
+
+        Environments are created under a temporary name and then renamed, so
+        the build is scanned for both the build path and the final path, the
+        build path is rewritten to the final one, and the manifest is written
+        into the build, all before the rename.
+        """
+        needles = [build_path.encode('utf-8'), base_path.encode('utf-8')]
+        rewrite = []
+        total_bytes = 0
+        for root, _dirs, files in os.walk(build_path):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.islink(path):
+                    continue
+                total_bytes += os.path.getsize(path)
+                with open(path, mode='rb') as file:
+                    data = file.read()
+                if b'\0' in data or not any(needle in data for needle in needles):
+                    continue
+                if build_path.encode('utf-8') in data:
+                    with open(path, mode='wb') as file:
+                        file.write(data.replace(needles[0], needles[1]))
+                rewrite.append(os.path.relpath(path, build_path))
+        manifest = {
+            'base_path': base_path,
+            'cold_seconds': cold_seconds,
+            'requirements': requirements,
+            'rewrite': sorted(rewrite),
+            'total_bytes': total_bytes,
+        }
+        with open(os.path.join(build_path, MANIFEST_NAME), mode='w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2)
+
+    def _share_file(self, src, dst):
+        if self.mode == 'hardlink':
+            try:
+                os.link(src, dst)
+                return True
+            except OSError:
+                shutil.copy2(src, dst)
+                return False
+        if self.mode == 'reflink':
+            return _clone_file(src, dst)
+        shutil.copy2(src, dst)
+        return False
+
+    @timed('VenvProvisioner')
+    def materialize(self, target, requirements=()):
+        """
+        Creates a virtual environment at `target` from a warm base environment.
+
+        Args:
+            target (str): The path of the environment to create; it must not
+            already exist.
+            requirements (iterable): Requirement strings to install.
+
+        Returns:
+            ProvisionReport: Timing and byte counts for this environment. Its
+            time includes building the base environment when this call had
+            to, so a cold call saves nothing.
+
+        Raises:
+            FileExistsError: If `target` already exists.
+        """
+        if os.path.lexists(target):
+            raise FileExistsError(f"{target} already exists")
+        # Timed from before base_env, so the call that builds the base reports no savings.
+        start = time.perf_counter()
+        base_path = self.base_env(requirements)
+        with open(os.path.join(base_path, MANIFEST_NAME), mode='r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        rewrite = set(manifest['rewrite'])
+        old_prefix = base_path.encode('utf-8')
+        new_prefix = os.path.abspath(target).encode('utf-8')
+        bytes_shared = bytes_copied = 0
+
+        for root, dirs, files in os.walk(base_path):
+            rel_root = os.path.relpath(root, base_path)
+            dest_root = os.path.normpath(os.path.join(target, rel_root))
+            os.makedirs(dest_root, exist_ok=True)
+            for name in dirs + files:
+                src = os.path.join(root, name)
+                dst = os.path.join(dest_root, name)
+                rel_path = os.path.normpath(os.path.join(rel_root, name))
+                if os.path.islink(src):
+                    link = os.readlink(src)
+                    if link.startswith(base_path):
+                        link = os.path.abspath(target) + link[len(base_path):]
+                    os.symlink(link, dst)
+                    if name in dirs:
+                        dirs.remove(name)
+                elif name in dirs or rel_path == MANIFEST_NAME:
+                    continue
+                elif rel_path in rewrite:
+                    with open(src, mode='rb') as file:
+                        data = file.read().replace(old_prefix, new_prefix)
+                    with open(dst, mode='wb') as file:
+                        file.write(data)
+                    shutil.copymode(src, dst)
+                    bytes_copied += len(data)
+                else:
+                    size = os.path.getsize(src)
+                    if self._share_file(src, dst):
+                        bytes_shared += size
+                    else:
+                        bytes_copied += size
+
+        return ProvisionReport(target, os.path.basename(base_path), time.perf_counter() - start,
+                               manifest['cold_seconds'], bytes_shared, bytes_copied)
@@ -0,0 +1,312 @@
+"""watcher.py
+File watching and live regeneration of scaffolded artifacts.
+
+This module provides the `FileWatcher` class, which reports the files that
+changed under a set of directories, and `watch`, which keeps a project's
+generated files up to date. On Linux the watcher uses inotify (through
+ctypes, without extra dependencies) and sleeps until the kernel reports an
+event; elsewhere, or when inotify is unavailable, it polls modification
+times. Bursts of events, such as an editor's write-rename-chmod sequence or
+a `git checkout`, are coalesced: a batch ends once no event arrived for the
+debounce interval.
+
+`watch` maps each batch of changed paths to the pipeline steps that declare
+them as inputs, plus every step downstream of those, and reruns only that
+subset against a BuildState, so steps whose fingerprint did not change (e.g.
+requirements.txt after a [Metadata] edit) are skipped as well. Files the
+pipeline writes itself are ignored, so regeneration does not retrigger.
+
+Ex. Usage:
+watcher = FileWatcher(['.'])
+changed = watcher.changes(debounce=0.05)
+watch(lambda: build_pipeline(...), roots=['.'])
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from src.build_state import STATE_FILE, BuildState
+from src.file_emitter import FileEmitter
+from src.readme_generator import EXCLUDED_DIRS
+
+IGNORED_SUFFIXES = ('.tmp', '.swp', '.swx', '~')
+
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _is_ignored_name(name):
+    return name.endswith(IGNORED_SUFFIXES) or name == STATE_FILE
+
+
+class _PollingBackend:
+    """
+    Detects changes by comparing (mtime, size) snapshots of the watched trees.
+    """
+
+    def __init__(self, roots, excluded_dirs, interval):
+        self.roots = roots
+        self.excluded_dirs = excluded_dirs
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        stack = list(self.roots)
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self.excluded_dirs:
+                                    snapshot[entry.path] = None
+                                    stack.append(entry.path)
+                            elif not _is_ignored_name(entry.name):
+                                stat = entry.stat(follow_symlinks=False)
+                                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    def read(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._snapshot()
+            changed = {path for path in current.keys() | self.snapshot.keys()
+                       if current.get(path, 0) != self.snapshot.get(path, 0)}
+            self.snapshot = current
+            if changed:
+                return changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """
+    Receives change events from the Linux kernel, one watch per directory.
+    """
+
+    def __init__(self, roots, excluded_dirs):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.excluded_dirs = excluded_dirs
+        self.directories = {}
+        try:
+            for root in roots:
+                self._watch_tree(root)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _watch_tree(self, root):
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if not os.path.isdir(directory):
+                    continue
+                raise OSError(errno, f"cannot watch {directory}: {os.strerror(errno)}")
+            self.directories[wd] = directory
+            try:
+                with os.scandir(directory) as entries:
+                    stack.extend(entry.path for entry in entries
+                                 if entry.is_dir(follow_symlinks=False) and entry.name not in self.excluded_dirs)
+            except OSError:
+                continue
+
+    def read(self, timeout):
+        """
+        Waits up to `timeout` seconds for events.
+
+        Returns:
+            set: The changed paths, or None if the kernel queue overflowed and
+            changes were lost.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0'))
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                directory = self.directories.get(wd)
+                if mask & IN_IGNORED:
+                    self.directories.pop(wd, None)
+                    continue
+                if directory is None or _is_ignored_name(name):
+                    continue
+                path = os.path.join(directory, name) if name else directory
+                if mask & IN_ISDIR:
+                    if name in self.excluded_dirs:
+                        continue
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        try:
+                            self._watch_tree(path)
+                        except OSError:
+                            pass  # Out of watches: the directory itself is still reported.
+                changed.add(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    Reports batches of changed files under a set of directories.
+    """
+
+    def __init__(self, roots, excluded_dirs=EXCLUDED_DIRS, interval=0.1, polling=False):
+        """
+        Initializes a new instance of the FileWatcher class.
+
+        Args:
+            roots (iterable): Directories to watch recursively.
+            excluded_dirs (iterable): Directory names never descended into.
+            interval (float): Seconds between scans when polling.
+            polling (bool): Poll even where inotify is available.
+        """
+        roots = sorted(set(os.path.abspath(root) for root in roots))
+        # Trees are watched recursively, so nested roots would be watched twice.
+        self.roots = [root for root in roots
+                      if not any(root.startswith(other.rstrip(os.sep) + os.sep) for other in roots)]
+        excluded_dirs = frozenset(excluded_dirs)
+        self.backend = None
+        if not polling and hasattr(os, 'O_CLOEXEC') and os.uname().sysname == 'Linux':
+            try:
+                self.backend = _InotifyBackend(self.roots, excluded_dirs)
+            except (OSError, AttributeError):
+                self.backend = None
+        if self.backend is None:
+            self.backend = _PollingBackend(self.roots, excluded_dirs, interval)
+
+    @property
+    def kind(self):
+        return 'inotify' if isinstance(self.backend, _InotifyBackend) else 'polling'
+
+    def changes(self, debounce=0.05, max_delay=1.0, timeout=None):
+        """
+        Blocks until files change, then collects the rest of the burst.
+
+        Args:
+            debounce (float): A batch ends after this many quiet seconds.
+            max_delay (float): A batch ends at the latest this many seconds
+            after its first event, even if events keep arriving.
+            timeout (float): Give up after this many seconds without events.
+
+        Returns:
+            set: Changed paths relative to the working directory (empty on
+            timeout), or None if changes were lost and everything should be
+            considered changed.
+        """
+        first = self.backend.read(timeout)
+        if not first:
+            return first
+        changed = set(first)
+        deadline = time.monotonic() + max_delay
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            more = self.backend.read(min(debounce, remaining))
+            if more is None:
+                return None
+            if not more:
+                break
+            changed |= more
+        return {os.path.relpath(path) for path in changed}
+
+    def close(self):
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def watch(build, roots=('.',), project_dir='.', debounce=0.05, polling=False, report=print, stop=None):
+    """
+    Regenerates the artifacts affected by each batch of changes until interrupted.
+
+    Args:
+        build (callable): Returns a fresh Pipeline of file-only steps; it is
+        called for every batch so that components see the current config.
+        roots (iterable): Directories to watch.
+        project_dir (str): The project the BuildState belongs to.
+        debounce (float): Seconds of quiet that end a batch of changes.
+        polling (bool): Force the polling watcher.
+        report (callable): Receives one line per batch.
+        stop (threading.Event): Ends the loop when set; checked between batches.
+    """
+    state = BuildState(project_dir)
+    pipeline = build()
+    emitter = FileEmitter(durable=False)
+    with emitter.activate():
+        pipeline.run(state)
+    emitter.commit()
+    with FileWatcher(roots, polling=polling) as watcher:
+        report(f"Watching {', '.join(watcher.roots)} ({watcher.kind}); press Ctrl+C to stop.")
+        while stop is None or not stop.is_set():
+            changed = watcher.changes(debounce=debounce, timeout=0.5 if stop is not None else None)
+            if changed is not None:
+                outputs = {os.path.normpath(output) for step in pipeline.steps.values() for output in step.outputs}
+                changed = {path for path in changed if os.path.normpath(path) not in outputs}
+                if not changed:
+                    continue
+            start = time.perf_counter()
+            pipeline = build()
+            names = set(pipeline.steps) if changed is None else pipeline.affected(changed)
+            if not names:
+                continue
+            emitter = FileEmitter(durable=False)
+            with emitter.activate():
+                results = pipeline.subset(names).run(state)
+            written = emitter.commit()
+            elapsed = (time.perf_counter() - start) * 1000
+            failed = [f"{result.name}: {result.error}" for result in results.values() if result.status == 'failed']
+            if failed:
+                report(f"Failed {'; '.join(failed)}")
+            written = [os.path.relpath(path) for path in written if os.path.basename(path) != STATE_FILE]
+            if written:
+                report(f"Regenerated {', '.join(written)} in {elapsed:.1f} ms")
+            else:
+                report(f"Checked {', '.join(sorted(names))}: up to date ({elapsed:.1f} ms)")
@@ -0,0 +1,89 @@
+"""test_gitignore.py
+Checks that `compile_gitignore` ignores exactly the same paths as its input.
+
+Each case writes the original rules and the compiled rules into two git
+repositories holding the same generated tree, and compares what
+`git check-ignore` reports for every path in it.
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from src.gitignore import compile_gitignore
+
+NAMES = ('build', 'foo', 'lib', 'a.log', 'b.pyc')
+RULES = (
+    'build', 'build/', '/build', '/build/', '!build', '!build/', '/build/foo', '!/build/foo', 'build/foo/',
+    'foo', 'foo/', '!foo', '/foo', '*.log', '!a.log', '*.pyc', '!*.pyc', 'lib/', '!lib/', '/lib/*.log', '**/foo',
+    'build/**', '*', '!*/',
+)
+
+
+def generate_paths(depth=3):
+    """
+    Lists every path of a small tree, with files named like directories.
+    """
+    paths, level = [], ['']
+    for _ in range(depth):
+        level = [f'{parent}{name}' for parent in level for name in NAMES]
+        paths.extend(level)
+        level = [f'{path}/' for path in level if '.' not in path]
+    return paths
+
+
+def check_ignore(repository, paths):
+    """
+    Returns the subset of `paths` that git ignores in `repository`.
+    """
+    result = subprocess.run(['git', 'check-ignore', '--stdin'], cwd=repository, input='\n'.join(paths),
+                            capture_output=True, text=True, check=False)
+    if result.returncode not in (0, 1):
+        raise RuntimeError(result.stderr)
+    return set(result.stdout.splitlines())
+
+
+@unittest.skipIf(shutil.which('git') is None, "git is not installed")
+class CompileGitignoreTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.paths = generate_paths()
+        self.repositories = []
+        for name in ('original', 'compiled'):
+            repository = os.path.join(self.root, name)
+            subprocess.run(['git', 'init', '-q', repository], check=True)
+            for path in self.paths:
+                target = os.path.join(repository, path)
+                if '.' in os.path.basename(path):
+                    open(target, 'w', encoding='utf-8').close()
+                else:
+                    os.makedirs(target, exist_ok=True)
+                    open(os.path.join(target, 'file'), 'w', encoding='utf-8').close()
+            self.repositories.append(repository)
+        self.paths += [f'{path}/file' for path in self.paths if '.' not in os.path.basename(path)]
+
+    def assert_same_ignores(self, text):
+        compiled = compile_gitignore([('Test', text)])
+        for repository, content in zip(self.repositories, (text, compiled)):
+            with open(os.path.join(repository, '.gitignore'), 'w', encoding='utf-8') as file:
+                file.write(content)
+        original, minimized = (check_ignore(repository, self.paths) for repository in self.repositories)
+        self.assertEqual(original, minimized, f"\n--- original\n{text}--- compiled\n{compiled}")
+
+    def test_negation_after_parent_directory_rule(self):
+        self.assert_same_ignores('/build/foo\nbuild/\n!build/\n')
+
+    def test_random_rule_sets(self):
+        generator = random.Random(2024)
+        for _ in range(200):
+            rules = generator.choices(RULES, k=generator.randint(1, 6))
+            with self.subTest(rules=rules):
+                self.assert_same_ignores('\n'.join(rules) + '\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""test_template_cache.py
+Checks `TemplateCache` against a local HTTP server.
+
+The server stands in for raw.githubusercontent.com: it serves in-memory
+templates with an ETag and a Last-Modified date, answers conditional
+requests with 304 Not Modified, and records every request it receives.
+"""
+
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from src.http_transport import HTTPTransport
+from src.template_cache import TemplateCache
+
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+
+class TemplateServer(http.server.ThreadingHTTPServer):
+    """
+    Serves `templates`, a dict of path to (body, etag), on a free local port.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), TemplateHandler)
+        self.templates = {}
+        self.requests = []
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server_port}{path}'
+
+
+class TemplateHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path not in self.server.templates:
+            self.send_error(404)
+            return
+        body, etag = self.server.templates[self.path]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class TemplateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = TemplateServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.transport = HTTPTransport(retries=0, timeout=(1, 5))
+        self.addCleanup(self.transport.close)
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def make_cache(self, **kwargs):
+        return TemplateCache(cache_dir=self.cache_dir, transport=self.transport, **kwargs)
+
+    def object_path(self, cache, url):
+        return cache._object_path(cache.index[url]['digest'])  # pylint: disable=protected-access
+
+    def test_not_modified_serves_cached_body(self):
+        self.server.templates['/Python.gitignore'] = (b'__pycache__/\n', '"v1"')
+        url = self.server.url('/Python.gitignore')
+        cache = self.make_cache(ttl=0)
+        self.assertEqual(cache.get(url), '__pycache__/\n')
+        stored = os.stat(self.object_path(cache, url))
+
+        # Same ETag, different body: only a 304 explains getting the old text back.
+        self.server.templates['/Python.gitignore'] = (b'changed\n', '"v1"')
+        self.assertEqual(cache.get(url), '__pycache__/\n')
+        _, headers = self.server.requests[-1]
+        self.assertEqual(headers.get('If-None-Match'), '"v1"')
+        self.assertEqual(headers.get('If-Modified-Since'), LAST_MODIFIED)
+        self.assertEqual(os.stat(self.object_path(cache, url)).st_mtime_ns, stored.st_mtime_ns)
+        self.assertEqual(len(os.listdir(os.path.dirname(self.object_path(cache, url)))), 1)
+
+        self.server.templates['/Python.gitignore'] = (b'changed\n', '"v2"')
+        self.assertEqual(cache.get(url), 'changed\n')
+
+    def test_offline_serves_stale_entries(self):
+        self.server.templates['/mit.txt'] = (b'MIT License\n', '"mit"')
+        url = self.server.url('/mit.txt')
+        self.assertEqual(self.make_cache().get(url), 'MIT License\n')
+        count = len(self.server.requests)
+
+        cache = self.make_cache(ttl=0, offline=True)
+        self.assertEqual(cache.get(url), 'MIT License\n')
+        self.assertIsNone(cache.get(self.server.url('/unknown.txt')))
+        self.assertEqual(len(self.server.requests), count)
+
+    def test_evicts_least_recently_used_at_size_cap(self):
+        urls = {}
+        for name in ('a', 'b', 'c'):
+            self.server.templates[f'/{name}'] = (name.encode() * 10, f'"{name}"')
+            urls[name] = self.server.url(f'/{name}')
+        cache = self.make_cache(max_bytes=25)
+        cache.get(urls['a'])
+        cache.get(urls['b'])
+        b_object = self.object_path(cache, urls['b'])
+        cache.get(urls['a'])  # A fresh hit makes 'a' the most recently used.
+        cache.get(urls['c'])
+
+        self.assertEqual(set(cache.index), {urls['a'], urls['c']})
+        self.assertFalse(os.path.exists(b_object))
+        self.assertEqual(set(self.make_cache(max_bytes=25).index), {urls['a'], urls['c']})
+
+
+if __name__ == '__main__':
+    unittest.main()